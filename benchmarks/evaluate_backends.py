@@ -0,0 +1,37 @@
+"""
+Times each backend of P3D.expressions.evaluate over a range of array sizes,
+to show where numexpr becomes faster than NumPy, and how 'auto' chooses between them.
+Run with: python benchmarks/evaluate_backends.py
+"""
+import timeit
+import numpy as np
+import P3D.expressions as p3e
+
+expressions = ['x^2 + y^2', 'sin(x) cos(y) + ln(1 + x^2)', 'exp(-(x^2 + y^2)) sqrt(x^2 + y^2)']
+sizes = [1, 16, 256, 4096, 2**14, 2**16, 2**18, 2**20]
+backends = ['math', 'numpy', 'numexpr', 'auto']
+
+def best_time(text, variables, backend):
+    """The best time of one evaluation, in microseconds"""
+    p3e.evaluate(text, dict(variables), backend) # Compile outside of the timing
+    timer = timeit.Timer(lambda: p3e.evaluate(text, dict(variables), backend))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat = 3, number = number)) / number * 1e6
+
+for text in expressions:
+    print(f'\n{text}')
+    print(f"{'size':>10}" + ''.join(f'{backend:>12}' for backend in backends) + f"{'fastest':>12}")
+    for size in sizes:
+        if size == 1:
+            variables = {'x': 0.5, 'y': 0.25}
+        else:
+            variables = {'x': np.linspace(0.1, 1, size), 'y': np.linspace(1, 2, size)}
+        times = {}
+        for backend in backends:
+            if backend == 'math' and size > 1:
+                continue
+            times[backend] = best_time(text, variables, backend)
+        fastest = min((backend for backend in times if backend != 'auto'), key = times.get)
+        print(f'{size:>10}' + ''.join(f'{times[backend]:>12.1f}' if backend in times else f"{'-':>12}" for backend in backends) + f'{fastest:>12}')
+print('\nTimes are in microseconds.')
+print(f'numexpr_threshold = {p3e.numexpr_threshold}')
@@ -0,0 +1,20 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import numpy as np
+
+x = np.linspace(-3, 3, 151)
+X, Y = np.meshgrid(x, x)
+fig = p3g.Figure(data = [p3g.Surface(X, Y, np.sin(X * Y))])
+fig.update_layout(scene = dict(zaxis = dict(range = [-1, 1])))
+
+def frames(t): #t holds the time of each frame in the batch, so all of them are computed at once
+    return dict(z = np.sin(X * Y - t[:, None, None]).astype(np.float32))
+
+app = p3w.Webpage()
+animation = p3w.Animation(app, 'graph', frames, id = 'animation', fps = 30, step = 0.1)
+app.layout = [
+    animation, *animation.stores, #Like with Interval, the stores need to be in the layout too
+    p3w.Graph(fig, id = 'graph', height = 0.9)
+]
+
+app.run(debug = True)
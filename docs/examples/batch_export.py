@@ -0,0 +1,14 @@
+"""
+Exports 100 surfaces to standalone HTML pages, which all share one local copy of plotly.js
+"""
+import P3D.graphing as p3g
+from P3D.export import export_figures
+import numpy as np
+
+if __name__ == '__main__': # Needed since the figures are exported by several processes
+    x = np.linspace(-1, 1, 101)
+    X, Y = np.meshgrid(x, x)
+    figures = [p3g.Figure(data = [p3g.Surface(X, Y, np.sin(a * X * Y))]) for a in np.linspace(1, 10, 100)]
+
+    report = export_figures(figures, 'reports', names = [f'surface_{i}' for i in range(100)])
+    print(f"{report['figures']} figures in {report['seconds']:.2f} s ({report['megabytes_per_second']:.1f} MB/s)")
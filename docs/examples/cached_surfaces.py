@@ -0,0 +1,12 @@
+import P3D.graphing as p3g
+import P3D.cache as p3c
+import numpy as np
+
+#Surfaces are saved in the cache the first time, then loaded from it by later runs and other processes
+cache = p3c.ArrayCache('p3d_cache', max_bytes = 2**28)
+x = np.linspace(-3, 3, 401)
+
+fig = p3g.Figure()
+fig.add_expression_slider('sin(t x y) exp(-(x^2 + y^2) / t)', np.linspace(0.5, 5, 19), x, x, cache = cache)
+fig.show()
+print(cache.stats)
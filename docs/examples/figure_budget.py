@@ -0,0 +1,21 @@
+import P3D.graphing as p3g
+import numpy as np
+
+x = np.linspace(-3, 3, 501)
+X, Y = np.meshgrid(x, x)
+t = np.linspace(0, 2, 11)
+
+#Slider figures send every step, even the hidden ones
+fig = p3g.Figure(budget = 4_000_000, budget_action = 'decimate')
+fig.add_slider(t, [p3g.Surface(X, Y, np.sin(X * Y + a)) for a in t])
+
+usage = fig.memory_usage()
+print(f"{usage['nbytes']:,} bytes of arrays, about {usage['serialized_bytes']:,} bytes to send, {usage['hidden_traces']} hidden traces")
+for trace in usage['traces'][:2]:
+    print(trace['index'], trace['type'], trace['arrays'])
+
+#Over its budget, the figure is changed to float32 and then to fewer points.
+#Dash does this itself when sending the figure; fig.show() does not, so it is done here first
+usage = fig.enforce_budget()
+fig.show()
+print(f"Sent about {usage['serialized_bytes']:,} bytes, with z of shape {fig.data[0].z.shape}")
@@ -0,0 +1,25 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import numpy as np
+
+x = np.linspace(-2, 2, 101)
+# The expression is evaluated on the grid once; moving the slider only finds the mesh again
+surface = p3g.ImplicitSurface('x^4 + y^4 + z^4 - (x^2 + y^2 + z^2)', x, x, x)
+fig = p3g.Figure(data = [surface.mesh(level = 0, color = 'lightblue')])
+
+app = p3w.Webpage()
+
+slider = p3w.Slider(min = -0.2, max = 2, step = 0.01, value = 0, id = 'level', marks = None, throttle = 100)
+app.layout = [
+    p3w.Graph(fig, id = 'graph', height = 0.8),
+    slider, slider.throttled
+]
+
+def change_level(level):
+    fig.data = [] # Replace the old mesh
+    fig.add_trace(surface.mesh(level = level, color = 'lightblue'))
+    return fig
+
+slider.on_change(app, change_level, outputs = [['graph', 'figure']])
+
+app.run(debug = True)
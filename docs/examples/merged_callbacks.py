@@ -0,0 +1,34 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import numpy as np
+from dash import html
+from dash.exceptions import PreventUpdate
+
+x = np.linspace(-3, 3, 101)
+X, Y = np.meshgrid(x, x)
+fig = p3g.Figure(data = [p3g.Surface(X, Y, np.sin(X * Y))])
+
+#With merge_callbacks, every handler of the interval below runs in one request on each tick
+app = p3w.Webpage(merge_callbacks = True)
+interval = p3w.Interval(app, id = 'interval', ms = 200, step = 0.05, value = 1)
+app.layout = [
+    interval, interval.value,
+    p3w.Graph(fig, id = 'graph', height = 0.8),
+    html.Div(id = 'value'),
+    html.Div(id = 'peak')
+]
+
+def show(a):
+    fig.update_traces(z = np.sin(a * X * Y))
+    return fig
+
+def peak(a):
+    if round(a / 0.05) % 10: #Only sent every 10 ticks; the other outputs are still sent
+        raise PreventUpdate
+    return f'Peak: {np.max(np.sin(a * X * Y)):.3f}'
+
+interval.on_tick(app, show, outputs = [['graph', 'figure']], starting_call = True)
+interval.on_tick(app, lambda a: f'a = {a:.2f}', outputs = [['value', 'children']], starting_call = True)
+interval.on_tick(app, peak, outputs = [['peak', 'children']], starting_call = True)
+
+app.run(debug = True)
@@ -0,0 +1,20 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import numpy as np
+
+x = np.linspace(-3, 3, 301)
+X, Y = np.meshgrid(x, x)
+
+app = p3w.Webpage(compression = True, cache_layout = True)
+slider = p3w.Slider(min = 0, max = 5, step = 0.1, value = 1, id = 'slider')
+app.layout = [slider, p3w.Graph(id = 'graph', height = 0.8)]
+
+def show(a):
+    return p3g.Figure(data = [p3g.Surface(X, Y, np.sin(a * X * Y))])
+
+slider.on_change(app, show, outputs = [['graph', 'figure']], starting_call = True)
+
+#Instead of app.run(debug = True); needs pip install P3D[serve]
+#Everything above is made once, then shared by 4 worker processes handling 8 requests each at once
+#Only this computer can connect; add host = '0.0.0.0' to accept connections from other computers
+app.serve(port = 8050, workers = 4, threads = 8)
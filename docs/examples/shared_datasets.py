@@ -0,0 +1,20 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import P3D.datasets as p3d
+import numpy as np
+
+#Every worker process running this app shares one copy of the grid, loaded by whichever registers it first
+datasets = p3d.DatasetRegistry('shared_example')
+x = datasets.register('x', lambda: np.linspace(-3, 3, 1001))
+Z = datasets.register('Z', lambda: np.sin(x[None, :] * x[:, None])) #Read-only; new arrays are made from it instead
+
+app = p3w.Webpage()
+slider = p3w.Slider(min = 0.5, max = 3, step = 0.1, value = 1, id = 'slider')
+app.layout = [slider, p3w.Graph(id = 'graph', height = 0.8)]
+
+def show(a):
+    return p3g.Figure(data = [p3g.Surface(x, x, Z * a)])
+
+slider.on_change(app, show, outputs = [['graph', 'figure']], starting_call = True)
+
+app.run(debug = True)
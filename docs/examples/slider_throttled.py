@@ -0,0 +1,24 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import numpy as np
+
+x = np.linspace(-3, 3, 301)
+X, Y = np.meshgrid(x, x)
+fig = p3g.Figure(data = [p3g.Surface(X, Y, np.sin(X * Y))])
+
+app = p3w.Webpage()
+
+#With throttle, the server is called at most once every 100 ms while dragging
+slider = p3w.Slider(min = 0, max = 5, step = 0.01, value = 1, id = 'slider', marks = None, throttle = 100)
+app.layout = [
+    slider, slider.throttled, #Like with Interval, the throttled value needs to be in the layout too
+    p3w.Graph(fig, id = 'graph', height = 0.8)
+]
+
+def show(a): #If this is slower than the throttle, only the latest value waits to be computed next
+    fig.update_traces(z = np.sin(a * X * Y) * np.exp(-(X**2 + Y**2) / a))
+    return fig
+
+slider.on_change(app, show, outputs = [['graph', 'figure']], starting_call = True)
+
+app.run(debug = True)
@@ -0,0 +1,32 @@
+import P3D.webpage as p3w
+import P3D.graphing as p3g
+import numpy as np
+import threading
+import time
+
+x = np.linspace(0, 2 * np.pi, 200)
+fig = p3g.Figure(data = [p3g.Line(x, np.sin(x))])
+
+app = p3w.Webpage()
+
+stream = p3w.Stream(app, id = 'stream')
+app.layout = [
+    stream, #Like Interval.value, the stream needs to be in the layout
+    p3w.Graph(fig, id = 'graph', height = 0.8)
+]
+
+#A producer on the server. Nothing is sent to the webpage until it publishes something
+def produce():
+    t = 0
+    while True:
+        time.sleep(np.random.uniform(0.1, 2)) #Updates come at irregular times
+        t += 0.5
+        fig.update_traces(y = np.sin(x - t))
+        stream.push('graph', 'figure', fig) #Sets the graph's figure directly; no callback is needed
+        #stream.publish(data) would instead set stream's own data, which can be used as a callback Input
+
+threading.Thread(target = produce, daemon = True).start()
+
+app.run(debug = True, use_reloader = False) #The reloader would start a second producer
+#In production, app.serve(threads = 32) uses a single worker process, as updates only reach webpages connected to this process,
+#and each open webpage holds one of the 32 threads
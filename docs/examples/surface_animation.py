@@ -0,0 +1,21 @@
+"""
+An animated surface z = sin(x - t) * cos(y), with play and pause buttons
+"""
+import P3D.graphing as p3g
+import numpy as np
+
+x = np.linspace(-np.pi, np.pi, 101)
+X, Y = np.meshgrid(x, x)
+T = np.linspace(0, 2 * np.pi, 200) # Time of each frame
+
+fig = p3g.Figure(data = [p3g.Surface(X, Y, np.sin(X) * np.cos(Y))])
+fig.update_bounds(z = [-1, 1]) # Keep the axis still while playing
+
+fig.add_animation(
+    frame_values = np.round(T, 3),
+    frames = [dict(z = np.sin(X - t) * np.cos(Y)) for t in T], # Only z changes; x and y are shared by every frame
+    fps = 30,
+    prefix = "t: "
+)
+
+fig.show()
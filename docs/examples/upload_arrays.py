@@ -0,0 +1,19 @@
+import P3D.webpage as p3w
+from dash import html
+
+app = p3w.Webpage()
+
+upload = p3w.Upload(id = 'upload-data', height = 0.1, multiple = True)
+app.layout = [
+    upload,
+    html.Div(id = 'text')
+]
+#With parse = True, each file arrives as NumPy arrays instead of a base64 string
+#.npy files are memory-mapped, .npz files are dictionaries of arrays, and .csv files are 2D float arrays
+def use_files(arrays, filenames, last_modified):
+    return [html.P(f'{name}: shape {array.shape}, mean {array.mean():.4g}') for array, name in zip(arrays, filenames) if not isinstance(array, dict)]
+
+upload.on_upload(app, use_files, outputs = [['text', 'children']], parse = True) #Multiple files are parsed in parallel
+
+
+app.run(debug = True)
@@ -1,2 +1,7 @@
 from .graphing import *
-from .webpage import *
\ No newline at end of file
+from .webpage import *
+from .export import *
+from .geometry import *
+from .cache import *
+from .datasets import *
+from .expressions import *
\ No newline at end of file
@@ -0,0 +1,210 @@
+import numpy as np
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Callable, Dict
+
+class ArrayCache():
+    """
+    A cache of NumPy arrays on disk, shared by every process using the same directory and kept between restarts.
+    Each array is saved as a ``.npy`` file named by a hash of what it was computed from, and is loaded memory-mapped,
+    so loading it takes no time and the operating system shares its memory between processes.
+    When the cache is larger than its limit, the least recently used arrays are removed
+    """
+    def __init__(self, directory: str = None, max_bytes: int = 2**30):
+        """
+        Creates a cache of arrays on disk
+
+        Parameters
+        ----------
+        directory
+            The directory to keep the arrays in. It is created if it does not exist.
+            Defaults to the ``P3D_CACHE`` environment variable, or else ``P3D`` in the user's cache directory
+        max_bytes
+            The most bytes the arrays can take up before the least recently used ones are removed
+        """
+        if directory is None:
+            directory = os.environ.get('P3D_CACHE') or os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'P3D')
+        os.makedirs(directory, exist_ok = True)
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self._stats: Dict[str, int] = dict(hits = 0, misses = 0, evictions = 0)
+        self._lock = threading.Lock()
+        self._size: int = None # Bytes in the directory when last scanned, plus what this process wrote since
+
+    @staticmethod
+    def key(*parts) -> str:
+        """
+        Makes the key of an array from everything it is computed from.
+        Parts can be strings, numbers, arrays, and lists, tuples, or dictionaries of them
+
+        :return key: a hex digest that is the same for equal parts, in any process
+        """
+        digest = hashlib.sha256()
+        ArrayCache._hash(digest, parts)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _hash(digest, part) -> None:
+        if isinstance(part, (np.ndarray, np.generic)):
+            part = np.ascontiguousarray(part)
+            digest.update(f'array{part.dtype.str}{part.shape}'.encode())
+            digest.update(part.data if part.dtype != object else repr(part.tolist()).encode())
+        elif isinstance(part, dict):
+            digest.update(f'dict{len(part)}'.encode())
+            for name in sorted(part, key = str):
+                ArrayCache._hash(digest, str(name))
+                ArrayCache._hash(digest, part[name])
+        elif isinstance(part, (list, tuple)):
+            digest.update(f'list{len(part)}'.encode())
+            for item in part:
+                ArrayCache._hash(digest, item)
+        elif isinstance(part, type):
+            digest.update(f'type{np.dtype(part).str}'.encode())
+        else:
+            text = repr(part)
+            digest.update(f'{type(part).__name__}{len(text)}:{text}'.encode())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npy')
+
+    def get(self, key: str) -> np.ndarray:
+        """
+        Loads an array from the cache
+
+        Parameters
+        ----------
+        key
+            the key made by :meth:`ArrayCache.key`
+
+        :return array: the read-only, memory-mapped array, or None if it is not in the cache
+        """
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode = 'r')
+        except (FileNotFoundError, ValueError, EOFError): # Missing, removed by another process, or not fully written
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        try:
+            os.utime(path) # Marks it as recently used
+        except OSError: # Files saved by other users can not be touched, and another process may have just removed it
+            pass
+        with self._lock:
+            self._stats['hits'] += 1
+        return array
+
+    def put(self, key: str, array: np.ndarray) -> np.ndarray:
+        """
+        Saves an array to the cache, then removes the least recently used arrays if the cache is too large.
+        The file is written under another name and renamed, so other processes never load a partly written array.
+        The directory is only scanned when the arrays counted at the last scan, plus those saved by this process since, are over `max_bytes`
+
+        Parameters
+        ----------
+        key
+            the key made by :meth:`ArrayCache.key`
+        array
+            the array to save. It cannot hold Python objects
+
+        :return array: the saved array, memory-mapped from the cache
+        """
+        descriptor, temporary = tempfile.mkstemp(suffix = '.tmp', dir = self.directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                np.save(file, np.asarray(array), allow_pickle = False)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        array = np.load(self._path(key), mmap_mode = 'r')
+        with self._lock:
+            if self._size is not None:
+                self._size += os.path.getsize(self._path(key))
+            full = self._size is None or self._size > self.max_bytes
+        if full: # Only scans the directory when it may be too large, not after every array
+            self.evict(self.max_bytes * 3 // 4) # With room left over, the next arrays do not each need a scan
+        return array
+
+    def get_or_compute(self, key: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Loads an array from the cache, or computes and saves it if it is not there
+
+        Parameters
+        ----------
+        key
+            the key made by :meth:`ArrayCache.key`
+        compute
+            function with no arguments that computes the array
+
+        :return array: the read-only, memory-mapped array
+        """
+        array = self.get(key)
+        if array is None:
+            array = self.put(key, compute())
+        return array
+
+    def evict(self, max_bytes: int = None) -> None:
+        """
+        Removes the least recently used arrays until the cache is small enough
+
+        Parameters
+        ----------
+        max_bytes
+            the most bytes to leave in the cache. Defaults to this cache's `max_bytes`
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.npy'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path) # Processes that already loaded it keep their memory map
+            except OSError: # Already removed, or in use on Windows
+                pass
+            else:
+                with self._lock:
+                    self._stats['evictions'] += 1
+            total -= size
+        with self._lock:
+            self._size = total
+
+    def clear(self) -> None:
+        """Removes every array from the cache"""
+        with self._lock:
+            self._size = None
+        for name in os.listdir(self.directory):
+            if name.endswith('.npy'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    @property
+    def size(self) -> int:
+        """The number of bytes the arrays in the cache take up"""
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.npy'):
+                    try:
+                        total += entry.stat().st_size
+                    except FileNotFoundError:
+                        pass
+        return total
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The number of arrays loaded from the cache, not found in it, and removed from it by this process"""
+        with self._lock:
+            return dict(self._stats)
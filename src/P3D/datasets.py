@@ -0,0 +1,207 @@
+import numpy as np
+import os
+import tempfile
+import threading
+import atexit
+import time
+import ctypes
+from typing import Callable, Dict, List, Union
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+class DatasetRegistry():
+    """
+    Named arrays loaded once and shared by every process of an app, such as the workers of a web server.
+    The first process to register a name loads the array into a memory-mapped file, in shared memory when possible,
+    and every process, including that one, gets a read-only view of that file instead of its own copy.
+    The process that loaded an array removes its file when it exits
+    """
+    def __init__(self, name: str = 'P3D', directory: str = None, timeout: float = 600):
+        """
+        Creates a registry of shared arrays
+
+        Parameters
+        ----------
+        name
+            The name of the registry. Processes using the same name share the same arrays, so each app should use its own
+        directory
+            The directory to keep the arrays in. Defaults to ``/dev/shm``, which is kept in memory, or else the temporary directory
+        timeout
+            The most seconds to wait for another process to load an array before giving up
+        """
+        if directory is None:
+            directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        self.directory: str = os.path.join(directory, f'{name}-datasets')
+        os.makedirs(self.directory, exist_ok = True)
+        self.timeout: float = timeout
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._owned: Dict[str, int] = {} # Names loaded by this registry, and the process that loaded them
+        self._lock = threading.Lock()
+        atexit.register(self._cleanup)
+
+    def _paths(self, name: str) -> tuple:
+        if os.sep in name or (os.altsep and os.altsep in name):
+            raise ValueError(f'Dataset names cannot contain path separators, got {name!r}')
+        return os.path.join(self.directory, f'{name}.npy'), os.path.join(self.directory, f'{name}.lock')
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        if os.name == 'nt': # os.kill would end the process on Windows
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(0x1000, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION
+            if not handle:
+                return kernel32.GetLastError() == 5 # Access denied, so it exists but belongs to another user
+            try:
+                code = ctypes.c_ulong()
+                return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259 # STILL_ACTIVE
+            finally:
+                kernel32.CloseHandle(handle)
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError: # Exists, but belongs to another user
+            return True
+        return True
+
+    def _acquire(self, lock: str, deadline: float) -> int:
+        # Opens the lock file and locks it, which the operating system undoes if this process dies
+        while True:
+            descriptor = os.open(lock, os.O_CREAT | os.O_RDWR)
+            try:
+                while True:
+                    try:
+                        if fcntl:
+                            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        else:
+                            msvcrt.locking(descriptor, msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if time.monotonic() > deadline:
+                            raise TimeoutError(f'{lock} was held by another process for {self.timeout} seconds')
+                        time.sleep(0.05)
+                try: # The file may have been removed while waiting, and then its lock no longer excludes anyone
+                    current = os.path.samestat(os.fstat(descriptor), os.stat(lock))
+                except FileNotFoundError:
+                    current = False
+            except BaseException:
+                os.close(descriptor)
+                raise
+            if current:
+                return descriptor
+            os.close(descriptor)
+
+    @staticmethod
+    def _release(descriptor: int) -> None:
+        if not fcntl:
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+        os.close(descriptor)
+
+    def register(self, name: str, data: Union[np.ndarray, Callable[[], np.ndarray]]) -> np.ndarray:
+        """
+        Loads an array under a name, unless a process has already loaded it
+
+        Parameters
+        ----------
+        name
+            the name of the array, the same in every process
+        data
+            the array, or a function with no arguments that loads it.
+            A function is only called by the one process that loads the array, so the others never hold their own copy
+
+        :return array: the read-only, memory-mapped array shared by every process
+        """
+        with self._lock:
+            if name in self._arrays:
+                return self._arrays[name]
+            path, lock = self._paths(name)
+            descriptor = self._acquire(lock, time.monotonic() + self.timeout) # Other processes wait here while this one loads it
+            try:
+                owner = os.read(descriptor, 32)
+                # Loads it unless a running process already has, as a process that did not exit cleanly leaves its files behind
+                if not (owner and self._alive(int(owner)) and os.path.exists(path)):
+                    try:
+                        array = data() if callable(data) else data
+                        temporary = f'{path}.{os.getpid()}.tmp'
+                        with open(temporary, 'wb') as file:
+                            np.save(file, np.asarray(array), allow_pickle = False)
+                        os.replace(temporary, path) # Other processes never see a partly written array
+                        os.ftruncate(descriptor, 0)
+                        os.lseek(descriptor, 0, os.SEEK_SET)
+                        os.write(descriptor, str(os.getpid()).encode())
+                        self._owned[name] = os.getpid()
+                    except BaseException:
+                        self._remove(name, descriptor)
+                        raise
+                self._arrays[name] = np.load(path, mmap_mode = 'r')
+            finally:
+                self._release(descriptor)
+            return self._arrays[name]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Gets an array already registered by any process
+
+        :return array: the read-only, memory-mapped array
+        """
+        with self._lock:
+            if name in self._arrays:
+                return self._arrays[name]
+            path, lock = self._paths(name)
+            if not os.path.exists(path):
+                raise KeyError(name)
+            self._arrays[name] = np.load(path, mmap_mode = 'r')
+            return self._arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays or os.path.exists(self._paths(name)[0])
+
+    @property
+    def names(self) -> List[str]:
+        """The names of every array registered by any process"""
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith('.npy'))
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of every array registered by any process, which is held once however many processes use them"""
+        return sum(os.path.getsize(os.path.join(self.directory, f'{name}.npy')) for name in self.names)
+
+    def _remove(self, name: str, descriptor: int = None) -> None:
+        path, lock = self._paths(name)
+        held = descriptor is not None
+        if not held:
+            descriptor = self._acquire(lock, time.monotonic() + self.timeout)
+        try:
+            try:
+                os.remove(path) # Processes still using the array keep their memory map
+            except FileNotFoundError:
+                pass
+            os.ftruncate(descriptor, 0) # Removing an open file fails on Windows, where the lock is left without an owner
+            try:
+                os.remove(lock) # Processes waiting on it see that it was removed and open it again
+            except OSError:
+                pass
+        finally:
+            if not held:
+                self._release(descriptor)
+        self._owned.pop(name, None)
+
+    def unregister(self, name: str) -> None:
+        """
+        Removes an array loaded by this process, so the next process to register its name loads it again.
+        Processes already using it keep their view of it
+        """
+        with self._lock:
+            self._arrays.pop(name, None)
+            if self._owned.get(name) == os.getpid():
+                self._remove(name)
+
+    def _cleanup(self) -> None:
+        # Forked workers inherit this, but only the process that loaded an array removes it
+        for name, pid in list(self._owned.items()):
+            if pid == os.getpid():
+                self._remove(name)
@@ -0,0 +1,136 @@
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+from plotly.io.json import to_json_plotly
+from _plotly_utils.utils import convert_to_base64 # Not public; the same conversion plotly uses when serializing figures
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Literal
+
+_page_start = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotlyjs}"></script>
+</head>
+<body style="margin: 0">
+<div id="figure" style="width: 100vw; height: 100vh"></div>
+<script>
+var figure = """
+
+_page_end = """;
+Plotly.newPlot("figure", figure.data, figure.layout, {config}).then(function(div) {{
+    if (figure.frames) {{
+        Plotly.addFrames(div, figure.frames);
+    }}
+}});
+</script>
+</body>
+</html>
+"""
+
+class _ScriptWriter():
+    """Writes JSON inside of a script tag, escaping every < so that strings cannot close the tag"""
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, text: str) -> None:
+        self.file.write(text.replace('<', '\\u003c'))
+
+def _figure_dict(figure: go.Figure) -> Dict:
+    # Avoids the deep copy made by to_dict; the dictionary is copied anyway when sent to a worker process,
+    # and the copy is converted to base64 there.
+    # Uses plotly's private _data, _layout, _frame_objs, and _props, which to_dict itself reads
+    result = {"data": figure._data, "layout": figure._layout}
+    frames = [frame._props for frame in figure._frame_objs]
+    if frames:
+        result["frames"] = frames
+    return result
+
+def _write_figure(figure: Dict, file) -> None:
+    # Writes the figure one trace, layout, and frame at a time, so the JSON of the whole figure is never built at once.
+    # Like Figure.to_json, to_json_plotly writes NaN and infinity as null, so the JSON is valid
+    file.write('{')
+    for i, (key, value) in enumerate(figure.items()):
+        file.write((',' if i else '') + json.dumps(key) + ':')
+        if isinstance(value, (list, tuple)):
+            file.write('[')
+            for j, item in enumerate(value):
+                file.write((',' if j else '') + to_json_plotly(item))
+            file.write(']')
+        else:
+            file.write(to_json_plotly(value))
+    file.write('}')
+
+def _export(job: tuple) -> int:
+    figure, path, format, plotlyjs, config = job
+    convert_to_base64(figure)
+    with open(path, 'w', encoding = 'utf-8') as file:
+        if format == 'json':
+            _write_figure(figure, file)
+        else:
+            file.write(_page_start.format(title = html.escape(os.path.splitext(os.path.basename(path))[0]), plotlyjs = plotlyjs))
+            _write_figure(figure, _ScriptWriter(file))
+            file.write(_page_end.format(config = json.dumps(config)))
+    return os.path.getsize(path)
+
+def export_figures(figures: List[go.Figure], directory: str, names: List[str] = None, format: Literal['html', 'json'] = 'html', processes: int = None, config: Dict = None) -> Dict[str, float]:
+    """
+    Exports many figures at once, in parallel, to standalone HTML pages or JSON files.
+    All HTML pages share one copy of plotly.js, written next to them, so they work offline.
+    When using more than one process on Windows or macOS, this must be called under ``if __name__ == '__main__':``
+
+    Parameters
+    ----------
+    figures
+        List of :class:`plotly.graph_objects.Figure` to export
+    directory
+        The directory to write the files to. It is created if it does not exist
+    names
+        The file name, without extension, for each figure. Defaults to ``figure_0``, ``figure_1``, ...
+    format
+        Whether to write HTML pages or JSON files
+    processes
+        The number of processes to export with. Defaults to the number of CPUs; set to 1 to export without any extra processes
+    config
+        Plotly configuration options given to every HTML page, such as ``dict(displayModeBar = False)``
+
+    :return report: the number of figures, total bytes written, seconds taken, figures per second, and megabytes per second
+    """
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok = True)
+    if names is None:
+        names = [f'figure_{i}' for i in range(len(figures))]
+    elif len(names) != len(figures):
+        raise ValueError(f'Got {len(names)} names for {len(figures)} figures; give one name for each figure')
+    plotlyjs = 'plotly.min.js'
+    written = 0
+    if format == 'html':
+        path = os.path.join(directory, plotlyjs)
+        source = get_plotlyjs()
+        if not os.path.exists(path) or os.path.getsize(path) != len(source.encode('utf-8')):
+            with open(path, 'w', encoding = 'utf-8') as file:
+                file.write(source)
+            written += os.path.getsize(path)
+    inline = processes == 1 or len(figures) <= 1
+    jobs = [
+        (figure.to_dict() if inline else _figure_dict(figure), os.path.join(directory, f'{name}.{format}'), format, plotlyjs, config or {})
+        for figure, name in zip(figures, names)
+    ]
+    if inline:
+        sizes = [_export(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            sizes = list(pool.map(_export, jobs, chunksize = max(1, len(jobs) // (4 * (processes or os.cpu_count() or 1)))))
+    written += sum(sizes)
+    seconds = time.perf_counter() - start
+    return {
+        'figures': len(jobs),
+        'bytes': written,
+        'seconds': seconds,
+        'figures_per_second': len(jobs) / seconds if seconds else float('inf'),
+        'megabytes_per_second': written / 1e6 / seconds if seconds else float('inf'),
+    }
@@ -0,0 +1,135 @@
+import numpy as np
+import numexpr as ne
+import sympy as sp
+import re
+import math
+import functools
+from typing import Callable, Dict, Literal, Union
+from sympy.parsing.sympy_parser import (
+    parse_expr,
+    standard_transformations,
+    implicit_multiplication_application,
+    convert_xor,
+)
+try:
+    import scipy
+except ImportError:
+    scipy = None
+
+_symbols = {'sin', 'cos', 'ln', 'pi', 'exp', 'log', 'tan', 'sqrt', 'abs', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh', 'floor', 'ceiling', 'Piecewise', 'Min', 'Max', 'erf'}
+_transforms = standard_transformations + (convert_xor, implicit_multiplication_application)
+_numexpr_functions = {'sin', 'cos', 'tan', 'sinh', 'cosh', 'tanh', 'log', 'exp', 'sqrt'}
+numexpr_threshold: int = 2**16 # Arrays with fewer elements than this are evaluated with NumPy, see benchmarks/evaluate_backends.py
+
+def convert(text:str, as_string: bool = True) -> Union[str, sp.Expr]:
+    """
+    Converts a normal math expression to a Python math expression
+
+    Parameters
+    ----------
+    text
+        the text to convert
+    as_string
+        whether to return the raw sympy expression output, or the string output
+    """
+    text = _parse(text)
+    return str(text) if as_string else text
+
+@functools.lru_cache(maxsize = 256)
+def _parse(text:str) -> sp.Expr:
+    names = set(re.findall(r"[A-Za-z_]\w*", text)) - _symbols
+    local_dict = {name: sp.Symbol(name) for name in names}
+    return parse_expr(text, local_dict, _transforms)
+
+@functools.lru_cache(maxsize = 256)
+def _compile(text:str, backend:str) -> Callable:
+    # Returns a function of a dictionary of variables that evaluates the expression with the given backend
+    expression = _parse(text)
+    if backend == 'numexpr':
+        converted = str(expression)
+        return lambda variables: ne.evaluate(converted, variables)
+    names = sorted(str(symbol) for symbol in expression.free_symbols)
+    if backend == 'numpy':
+        modules = ['scipy', 'numpy'] if scipy else 'numpy' # SciPy has array versions of special functions like erf
+    else:
+        modules = 'math'
+    function = sp.lambdify([sp.Symbol(name) for name in names], expression, modules = modules)
+    if backend == 'vectorized': # Calls the math version on each element, for functions with no array version
+        function = np.vectorize(function, otypes = [np.float64])
+    return lambda variables: function(*[variables[name] for name in names])
+
+@functools.lru_cache(maxsize = 256)
+def numexpr_supported(text:str) -> bool:
+    """
+    Whether a normal math expression can be evaluated by numexpr.
+    Expressions with functions such as piecewise functions, abs, or erf, and constants other than pi, can not be
+
+    Parameters
+    ----------
+    text
+        the math expression to check
+    """
+    expression = _parse(text)
+    # Min and Max are not sp.Function, but are applied like one
+    functions = {type(node).__name__ for node in sp.preorder_traversal(expression) if isinstance(node, sp.core.function.Application)}
+    constants = expression.atoms(sp.NumberSymbol) - {sp.pi}
+    return functions <= _numexpr_functions and not constants and not expression.has(sp.I)
+
+def evaluate(text:str, variables:Dict[str, any], backend:Literal['auto', 'numexpr', 'numpy', 'math'] = 'auto') -> any:
+    """
+    Evaluates a normal math expression using the values
+    of the variables given.
+    Each expression is only converted once, and then kept for every later evaluation
+
+    Parameters
+    ----------
+    text
+        the math expression to evaluate
+    variables
+        dictionary of variables names and their values
+    backend
+        how to evaluate the expression:\n
+        \t ``'numexpr'``: with numexpr, which is fastest for large arrays\n
+        \t ``'numpy'``: with NumPy, which is fastest for small arrays and supports every function\n
+        \t ``'math'``: with Python's math module, which is fastest when every variable is a single number\n
+        \t ``'auto'``: chooses from the above, using math for single numbers, numexpr when the arrays broadcast to at least
+        :data:`numexpr_threshold` elements and it supports the expression, and NumPy otherwise
+    """
+    variables['pi'] = np.pi
+    if backend == 'auto':
+        arrays = [value for value in variables.values() if not isinstance(value, (int, float, complex))]
+        if not arrays:
+            try:
+                return _compile(text, 'math')(variables)
+            except (ValueError, ZeroDivisionError, OverflowError, TypeError): # Such as log(-1), which NumPy gives as nan
+                backend = 'numpy'
+        # The product of the sizes is at least the broadcast size, and is much quicker to find
+        elif (math.prod(np.size(value) for value in arrays) < numexpr_threshold or not numexpr_supported(text)
+                or math.prod(np.broadcast_shapes(*(np.shape(value) for value in arrays))) < numexpr_threshold):
+            backend = 'numpy'
+        else:
+            try:
+                return _compile(text, 'numexpr')(variables)
+            except Exception: # numexpr could not evaluate it, but NumPy supports every function
+                backend = 'numpy'
+    if backend == 'numpy':
+        # Python numbers raise errors, like 1/0, where NumPy numbers give inf or nan
+        variables = {name: np.float64(value) if isinstance(value, (int, float)) else np.complex128(value) if isinstance(value, complex) else value
+                     for name, value in variables.items()}
+        with np.errstate(all = 'ignore'):
+            try:
+                return _compile(text, backend)(variables)
+            except TypeError: # A function with no array version was given an array
+                return _compile(text, 'vectorized')(variables)
+    return _compile(text, backend)(variables)
+
+def latex(text) -> str:
+    """
+    Converts a normal math expression into a latex formula
+
+    Parameters
+    ----------
+    text
+        the math expression to convert
+    """
+    return sp.latex(convert(text, as_string = False))
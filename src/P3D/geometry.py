@@ -0,0 +1,230 @@
+import numpy as np
+from typing import Tuple, Union
+
+def rref(Ab: np.ndarray, augmented: bool = True, tol: float = 1e-12) -> np.ndarray:
+    """
+    Puts many matrices into reduced row echelon form at once
+
+    Parameters
+    ----------
+    Ab
+        Array of shape (..., m, n), where each of the last 2 dimensions is a matrix.
+        For example, 100 augmented matrices of 2 equations in 3 variables have shape (100, 2, 4)
+    augmented
+        whether the last column is the augmented column b of Ax=b, which never has a pivot
+    tol
+        values with a smaller absolute value than this are treated as 0
+
+    :return rref: the reduced row echelon form of each matrix, with the same shape as `Ab`
+    """
+    Ab = np.array(Ab, dtype = np.float64) # Copy so that the input is not modified
+    shape = Ab.shape
+    Ab = Ab.reshape(-1, *shape[-2:])
+    B, m, n = Ab.shape
+    batch = np.arange(B)
+    rows = np.arange(m)
+    r = np.zeros(B, dtype = int) # Row of the next pivot in each matrix
+    for c in range(n - 1 if augmented else n):
+        # Choose the largest value at or below the next pivot row as the pivot, for stability
+        column = np.where(rows >= r[:, None], np.abs(Ab[:, :, c]), -1)
+        p = np.argmax(column, axis = 1)
+        found = (column[batch, p] > tol) & (r < m)
+        b, rb, pb = batch[found], r[found], p[found]
+        Ab[b, rb], Ab[b, pb] = Ab[b, pb], Ab[b, rb].copy() # Switch rows
+        Ab[b, rb] /= Ab[b, rb, c][:, None] # Make pivot equal to 1
+        factors = Ab[b, :, c].copy()
+        factors[np.arange(len(b)), rb] = 0
+        Ab[b] -= factors[:, :, None] * Ab[b, rb][:, None, :] # Make everything above and below pivot 0
+        r[found] += 1
+    Ab[np.abs(Ab) < tol] = 0
+    return Ab.reshape(shape)
+
+def plane_intersections(planes: np.ndarray, tol: float = 1e-12) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Finds the lines where many pairs of planes intersect at once
+
+    Parameters
+    ----------
+    planes
+        Array of shape (..., 2, 4). Each pair of rows [a, b, c, d] are 2 planes ax + by + cz = d
+    tol
+        pairs of planes whose normals have a cross product smaller than this are treated as parallel
+
+    :return lines: a point on each line, of shape (..., 3), the direction of each line, of shape (..., 3),
+        and whether each pair of planes meets in a line (False when they are parallel), of shape (...)
+    """
+    planes = np.asarray(planes, dtype = np.float64)
+    n1, n2 = planes[..., 0, :3], planes[..., 1, :3]
+    d1, d2 = planes[..., 0, 3:], planes[..., 1, 3:]
+    direction = np.cross(n1, n2)
+    length = np.sum(direction ** 2, axis = -1, keepdims = True)
+    valid = length[..., 0] > tol ** 2
+    length = np.where(valid[..., None], length, 1)
+    point = (d1 * np.cross(n2, direction) + d2 * np.cross(direction, n1)) / length
+    return point, direction, valid
+
+def clip_lines(point: np.ndarray, direction: np.ndarray, lower: Union[float, np.ndarray] = 0, upper: Union[float, np.ndarray] = 1, tol: float = 1e-12) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clips many lines to a box at once
+
+    Parameters
+    ----------
+    point, direction
+        Arrays of shape (..., 3) giving a point on each line and its direction
+    lower, upper
+        the lowest and highest corners of the box. Either a number used for all of x, y, and z,
+        or an array of 3 numbers; use ``np.inf`` for no bound. Defaults to the unit cube
+    tol
+        directions smaller than this along an axis are treated as parallel to that axis
+
+    :return segments: the 2 end points of each clipped line, of shape (..., 2, 3),
+        and whether each line passes through the box at all, of shape (...)
+    """
+    point = np.asarray(point, dtype = np.float64)
+    direction = np.asarray(direction, dtype = np.float64)
+    lower = np.broadcast_to(np.asarray(lower, dtype = np.float64), (3,))
+    upper = np.broadcast_to(np.asarray(upper, dtype = np.float64), (3,))
+    parallel = np.abs(direction) < tol
+    safe = np.where(parallel, 1, direction)
+    with np.errstate(invalid = 'ignore'):
+        t1 = (lower - point) / safe
+        t2 = (upper - point) / safe
+    inside = (point >= lower) & (point <= upper)
+    # Axes the line is parallel to do not limit it, as long as the line is within the box along them
+    t_min = np.where(parallel, -np.inf, np.minimum(t1, t2))
+    t_max = np.where(parallel, np.inf, np.maximum(t1, t2))
+    start = np.max(t_min, axis = -1)
+    end = np.min(t_max, axis = -1)
+    valid = np.all(inside | ~parallel, axis = -1) & (start <= end) & np.isfinite(start) & np.isfinite(end)
+    start = np.where(valid, start, 0)
+    end = np.where(valid, end, 0)
+    segments = point[..., None, :] + np.stack([start, end], axis = -1)[..., :, None] * direction[..., None, :]
+    return segments, valid
+
+def segments_to_line(segments: np.ndarray, valid: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Joins many line segments into the x, y, and z arrays of one :class:`P3D.graphing.Line`,
+    separated by NaN so that the segments are not connected to each other
+
+    Parameters
+    ----------
+    segments
+        Array of shape (..., 2, 3) of the 2 end points of each segment
+    valid
+        Array of shape (...) of which segments to keep; defaults to all of them
+
+    :return x,y,z: 1D arrays for :class:`P3D.graphing.Line`
+    """
+    segments = np.asarray(segments, dtype = np.float64).reshape(-1, 2, 3)
+    if valid is not None:
+        segments = segments[np.asarray(valid).reshape(-1)]
+    points = np.concatenate([segments, np.full((len(segments), 1, 3), np.nan)], axis = 1).reshape(-1, 3)[:-1]
+    return points[:, 0], points[:, 1], points[:, 2]
+
+def intersection_segments(planes: np.ndarray, lower: Union[float, np.ndarray] = 0, upper: Union[float, np.ndarray] = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds where many pairs of planes intersect within a box at once.
+    Combines :func:`plane_intersections` and :func:`clip_lines`
+
+    Parameters
+    ----------
+    planes
+        Array of shape (..., 2, 4). Each pair of rows [a, b, c, d] are 2 planes ax + by + cz = d
+    lower, upper
+        the lowest and highest corners of the box, as in :func:`clip_lines`. Defaults to the unit cube
+
+    :return segments: the 2 end points of each intersection, of shape (..., 2, 3),
+        and whether each pair of planes intersects within the box, of shape (...)
+    """
+    point, direction, valid = plane_intersections(planes)
+    segments, inside = clip_lines(point, direction, lower, upper)
+    return segments, valid & inside
+
+# Corners of a cube, and the 6 tetrahedra that split it, all sharing the diagonal from corner 0 to corner 6
+_cube_corners = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]])
+_cube_tetrahedra = np.array([[0, 5, 1, 6], [0, 1, 2, 6], [0, 2, 3, 6], [0, 3, 7, 6], [0, 7, 4, 6], [0, 4, 5, 6]])
+
+def _tetrahedron_table() -> Tuple[np.ndarray, np.ndarray]:
+    # For each of the 16 ways the 4 corners can be below the level, the edges (pairs of corners) that each triangle's points are on
+    edges = np.zeros((16, 2, 3, 2), dtype = int)
+    counts = np.zeros(16, dtype = int)
+    for case in range(16):
+        below = [v for v in range(4) if case >> v & 1]
+        above = [v for v in range(4) if not case >> v & 1]
+        if len(below) in (1, 3):
+            alone, others = (below[0], above) if len(below) == 1 else (above[0], below)
+            edges[case, 0] = [[alone, other] for other in others]
+            counts[case] = 1
+        elif len(below) == 2:
+            (a, b), (c, d) = below, above
+            edges[case, 0] = [[a, c], [a, d], [b, d]]
+            edges[case, 1] = [[a, c], [b, d], [b, c]]
+            counts[case] = 2
+    return edges, counts
+
+_tetrahedron_edges, _tetrahedron_counts = _tetrahedron_table()
+
+def marching_tetrahedra(field: np.ndarray, x: np.ndarray, y: np.ndarray, z: np.ndarray, level: float = 0, chunk: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds a triangle mesh of where a scalar field on a grid equals a level, for all cubes of the grid at once.
+    Each cube of the grid is split into 6 tetrahedra, which, unlike marching cubes, never has ambiguous cases
+
+    Parameters
+    ----------
+    field
+        3D array of shape (len(x), len(y), len(z)) of values at each grid point
+    x,y,z
+        1D arrays of the grid's axes
+    level
+        the value of the field on the surface
+    chunk
+        the number of grid slices along x meshed at once, which limits memory use
+
+    :return mesh: the points of the mesh, of shape (N, 3), and the indices of the 3 points of each triangle, of shape (M, 3)
+    """
+    field = np.asarray(field)
+    axes = [np.asarray(axis, dtype = np.float64) for axis in (x, y, z)]
+    shape = np.array(field.shape)
+    strides = np.array([shape[1] * shape[2], shape[2], 1])
+    keys = []
+    for start in range(0, shape[0] - 1, chunk):
+        block = field[start:min(start + chunk, shape[0] - 1) + 1]
+        # Only cubes with corners both below and above the level can hold part of the surface
+        corners = [block[i:block.shape[0] - 1 + i, j:shape[1] - 1 + j, k:shape[2] - 1 + k] for i, j, k in _cube_corners]
+        low = np.minimum.reduce(corners)
+        high = np.maximum.reduce(corners)
+        cubes = np.argwhere((low < level) & (high >= level))
+        if len(cubes) == 0:
+            continue
+        cubes[:, 0] += start
+        points = cubes[:, None, None, :] + _cube_corners[_cube_tetrahedra][None] # (cubes, 6, 4, 3) grid indices
+        points = points.reshape(-1, 4, 3)
+        values = field[points[..., 0], points[..., 1], points[..., 2]]
+        case = np.sum((values < level) << np.arange(4), axis = 1)
+        for t in range(2):
+            has = _tetrahedron_counts[case] > t
+            ends = _tetrahedron_edges[case[has], t] # (triangles, 3, 2) corners of the tetrahedron
+            ids = np.sum(points[has][np.arange(has.sum())[:, None, None], ends] * strides, axis = -1) # (triangles, 3, 2) grid point ids
+            keys.append(np.sort(ids, axis = -1))
+    if not keys:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype = int)
+    keys = np.concatenate(keys)
+    # Triangles sharing an edge of the grid share that point of the mesh
+    # Each sorted pair of grid points is packed into one key, as a 1D unique is far faster than one along an axis
+    packed = keys[..., 0].astype(np.int64) * field.size + keys[..., 1]
+    edges, faces = np.unique(packed.reshape(-1), return_inverse = True)
+    faces = faces.reshape(-1, 3)
+    flat = field.reshape(-1)
+    a, b = np.divmod(edges, field.size)
+    va, vb = flat[a].astype(np.float64), flat[b].astype(np.float64)
+    t = np.clip((level - va) / np.where(va == vb, 1, vb - va), 0, 1)
+    ia, ib = np.stack(np.unravel_index(a, shape), axis = -1), np.stack(np.unravel_index(b, shape), axis = -1)
+    pa = np.stack([axes[d][ia[:, d]] for d in range(3)], axis = -1)
+    pb = np.stack([axes[d][ib[:, d]] for d in range(3)], axis = -1)
+    vertices = pa + t[:, None] * (pb - pa)
+    # Point every triangle the same way, from below the level to above it
+    gradient = np.where((va < vb)[:, None], pb - pa, pa - pb)[faces].sum(axis = 1)
+    normal = np.cross(vertices[faces[:, 1]] - vertices[faces[:, 0]], vertices[faces[:, 2]] - vertices[faces[:, 0]])
+    flip = np.sum(normal * gradient, axis = 1) < 0
+    faces[flip] = faces[flip][:, [0, 2, 1]]
+    return vertices, faces[np.any(normal != 0, axis = 1)] # Triangles with no area are dropped
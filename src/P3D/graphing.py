@@ -1,14 +1,40 @@
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+from _plotly_utils.utils import convert_to_base64
 import numpy as np
-from typing import List, Union, Literal
+import bisect
+import math
+import itertools
+from copy import deepcopy
+from typing import List, Union, Literal, Dict
+from .expressions import evaluate
+from .geometry import marching_tetrahedra
+from .cache import ArrayCache
+
+_generations = itertools.count(1) # Each change to a trace or layout gets a new generation
+
+class FigureBudgetError(ValueError):
+    """Raised when a :class:`Figure` is larger than its budget, even after any downcasting and decimation allowed"""
+    def __init__(self, usage:Dict[str, any], budget:int):
+        self.usage: Dict[str, any] = usage
+        self.budget: int = budget
+        super().__init__(
+            f"Figure would be about {usage['serialized_bytes']:,} bytes when sent, over its budget of {budget:,} bytes "
+            f"({usage['nbytes']:,} bytes of arrays in {len(usage['traces'])} traces, {usage['hidden_traces']} of them hidden)"
+        )
 
 
 class Figure(go.Figure):
     """
     A figure.
     This extends :class:`plotly.graph_objects.Figure`.
+    Traces are indexed by name and type, so finding them does not need to look through every trace.
+    The serialized form of each trace and the layout is cached until they change.
     """
-    def __init__(self, data:List[go.Trace] = None, **kwargs):
+    _3d_types = {'scatter3d', 'surface', 'mesh3d', 'cone', 'streamtube', 'volume', 'isosurface'}
+    _line_types = {'scatter', 'scattergl', 'scatter3d'} # Types whose arrays can be decimated, with one point per element
+    _grid_types = {'surface', 'heatmap', 'contour'} # and with one point per element of z
+    def __init__(self, data:List[go.Trace] = None, budget:int = None, budget_action:Literal['raise', 'downcast', 'decimate'] = 'raise', **kwargs):
         """
         Creates a figure
 
@@ -16,8 +42,20 @@ class Figure(go.Figure):
         ----------
         data
             List of :class:`plotly.graph_objects.Trace` for this figure to have
+        budget
+            The most bytes this figure can be when sent, as estimated by :meth:`Figure.memory_usage`.
+            It is checked whenever this figure is converted to be sent, such as by Dash; see :meth:`Figure.enforce_budget`
+        budget_action
+            What to do when this figure is over its budget, as in :meth:`Figure.enforce_budget`
         """
         super().__init__(data = data, **kwargs)
+        self._budget: int = budget
+        self._budget_action: str = budget_action
+        self._usage_cache: Dict[int, tuple] = {}
+        self._index_traces()
+        self._trace_cache: Dict[int, list] = {}
+        self._layout_cache: list = None
+        self._layout_generation: int = 0
         self.update_layout(showlegend=False)
         self.update_layout(
             scene_aspectmode='cube',
@@ -61,8 +99,9 @@ class Figure(go.Figure):
             how each step on the slider is labelled
         """
         steps = []
-        N = len(self.data)
+        N = len(self._data_objs)
         A = sum([len(i) if isinstance(i, list) else 1 for i in traces])
+        new_traces = [] # Added all at once, since each add copies the list of traces
         for i in range(len(slider_values)):
             step = dict(
                 method="update",
@@ -70,37 +109,497 @@ class Figure(go.Figure):
                 args=[{"visible": [None] * N + [False] * A}]
             )
             if i < len(traces):
-                if isinstance(traces[i], list):
-                    for j in range(len(traces[i])):
-                        traces[i][j].visible = i == initial_step
-                        step["args"][0]["visible"][len(self.data)+j] = True
-                    self.add_traces(traces[i])
-                else:
-                    traces[i].visible = i == initial_step
-                    self.add_traces([traces[i]])
-                    step["args"][0]["visible"][len(self.data)-1] = True
+                step_traces = traces[i] if isinstance(traces[i], list) else [traces[i]]
+                for trace in step_traces:
+                    trace.visible = i == initial_step
+                    step["args"][0]["visible"][N + len(new_traces)] = True
+                    new_traces.append(trace)
             steps.append(step)
+        self.add_traces(new_traces)
         self.update_layout(
             sliders = list(self.layout.sliders) + [dict(steps = steps, active = initial_step, currentvalue={"prefix": prefix})]
         )
 
+    def add_expression_slider(self, expression:str, slider_values:List[float], x:np.ndarray[np.floating], y:np.ndarray[np.floating], variable:str = 't', variables:Dict[str, any] = {}, cache:ArrayCache = None, initial_step:int = 0, prefix:str = None, **kwargs) -> None:
+        """
+        Adds a slider of surfaces z = f(x, y, t) to this figure, with one surface for each value of t.
+        Every surface is computed ahead of time, so with a cache, later starts and other processes load them instead
+
+        Parameters
+        ----------
+        expression
+            A normal math expression of x, y, and the slider's variable, as used by :func:`P3D.expressions.evaluate`
+        slider_values
+            List of N values of the slider's variable
+        x,y
+            1D arrays of the grid's axes
+        variable
+            the name of the slider's variable in the expression
+        variables
+            dictionary of the names and values of any other variables in the expression
+        cache
+            An :class:`P3D.cache.ArrayCache` to load each surface from if it was computed before
+        initial_step
+            Which step (0 to N-1) to start the slider on
+        prefix
+            how each step on the slider is labelled. Defaults to the variable's name
+        kwargs
+            other properties of every surface, as in :class:`Surface`
+        """
+        traces = [Surface.from_expression(expression, x, y, variables | {variable: value}, cache, **kwargs) for value in slider_values]
+        self.add_slider(slider_values, traces, initial_step, f'{variable}: ' if prefix is None else prefix)
+
+    def add_animation(self, frame_values:List[float], frames:List[Union[Dict[str, np.ndarray], List[Dict[str, np.ndarray]]]], traces:List[int] = None, initial_frame:int = 0, fps:float = 10, transition:float = 0, prefix:str = "t: ") -> None:
+        """
+        Adds an animation to this figure, with play and pause buttons and a slider to choose frames.
+        Each frame only holds the properties that change, such as z, so the rest of each trace is shared by every frame
+
+        Parameters
+        ----------
+        frame_values
+            List of N different values labelling each frame
+        frames
+            List of N frames. Each frame is a dictionary of the properties to change, such as ``dict(z = Z)``,
+            or a list of such dictionaries, one for each trace in `traces`
+        traces
+            The indices of the traces in this figure that each frame changes.
+            Defaults to the last traces in this figure, one for each dictionary in a frame
+        initial_frame
+            Which frame (0 to N-1) to start the animation on
+        fps
+            How many frames to play each second
+        transition
+            How many milliseconds to spend smoothly changing from one frame to the next
+        prefix
+            how each frame on the slider is labelled
+        """
+        frames = [frame if isinstance(frame, list) else [frame] for frame in frames]
+        # Everything is checked and built before this figure is changed, so a bad argument leaves it as it was
+        if len(frame_values) != len(frames):
+            raise ValueError(f'Got {len(frame_values)} frame values for {len(frames)} frames; give one value for each frame')
+        if not 0 <= initial_frame < len(frames):
+            raise ValueError(f'initial_frame must be from 0 to {len(frames) - 1}, got {initial_frame}')
+        if traces is None:
+            traces = list(range(len(self._data_objs) - len(frames[0]), len(self._data_objs)))
+        if any(len(frame) != len(traces) for frame in frames):
+            raise ValueError(f'Every frame must have one dictionary for each of the {len(traces)} traces it changes')
+        types = [self.data[i].type for i in traces]
+        labels = [str(value) for value in frame_values]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f'Frame values must be different from each other, got {[label for label in labels if labels.count(label) > 1]} more than once')
+        # Frames are found by name, so each animation's names start with its own number
+        animation = len(self.layout.sliders)
+        existing = {frame.name for frame in self.frames}
+        while any(name.startswith(f'{animation}:') for name in existing):
+            animation += 1
+        names = [f'{animation}:{label}' for label in labels]
+        new_frames = [
+            go.Frame(name = name, traces = traces, data = [dict(type = t, **props) for t, props in zip(types, frame)])
+            for name, frame in zip(names, frames)
+        ]
+        play = dict(frame = dict(duration = 1000 / fps, redraw = True), transition = dict(duration = transition), fromcurrent = True, mode = 'immediate')
+        pause = dict(frame = dict(duration = 0, redraw = False), transition = dict(duration = 0), mode = 'immediate')
+        steps = [
+            dict(method = "animate", label = label, args = [[name], dict(pause, frame = dict(duration = 0, redraw = True))])
+            for label, name in zip(labels, names)
+        ]
+        y = 0.2 * -len(self.layout.sliders) # Each slider, and its buttons, goes below the ones before it
+        menu = go.layout.Updatemenu(
+            type = 'buttons', direction = 'left', x = 0, y = y, xanchor = 'left', yanchor = 'top', pad = dict(t = 40),
+            buttons = [
+                dict(label = 'Play', method = 'animate', args = [names, play]), # Only this animation's frames
+                dict(label = 'Pause', method = 'animate', args = [[None], pause])
+            ]
+        )
+        slider = go.layout.Slider(steps = steps, active = initial_frame, currentvalue = {"prefix": prefix}, x = 0.15, y = y, len = 0.85)
+        for i, props in zip(traces, frames[initial_frame]):
+            self.data[i].update(props)
+        self.frames = list(self.frames) + new_frames
+        self.update_layout(updatemenus = list(self.layout.updatemenus) + [menu], sliders = list(self.layout.sliders) + [slider])
+
     def type(self) -> Literal['2d', '3d']:
         """
         Returns what type of figure this is
         
         :return type: The type of figure this is, as a string
         """
-        for trace in self.data:
-            if ('3d' in trace.type) or ('3D' in trace.type):
-                return '3d'
-        return '2d'
+        return '3d' if self._traces_3d else '2d'
+
+    def update_trace_by_name(self, name:str, patch:dict = None, overwrite:bool = False, **kwargs) -> 'Figure':
+        """
+        Updates the traces with the given name, without looking through every trace.
+        Same as ``update_traces(patch, selector = dict(name = name), overwrite = overwrite, **kwargs)``
+
+        Parameters
+        ----------
+        name
+            The name of the traces to update
+        patch
+            Dictionary of properties to update
+        overwrite
+            Whether to replace existing properties instead of recursively updating them
+        kwargs
+            More properties to update
+
+        :return figure: This figure
+        """
+        for i in list(self._names.get(name, [])):
+            self._data_objs[i].update(patch, overwrite = overwrite, **kwargs)
+        return self
+
+    def select_traces(self, selector = None, row:int = None, col:int = None, secondary_y:bool = None):
+        """
+        Same as :meth:`plotly.graph_objects.Figure.select_traces`,
+        but selectors of only name and/or type are looked up in this figure's index
+        """
+        if isinstance(selector, str):
+            selector = dict(type = selector)
+        if not (isinstance(selector, dict) and selector and set(selector) <= {'name', 'type'}) or row is not None or col is not None or secondary_y is not None:
+            return super().select_traces(selector = selector, row = row, col = col, secondary_y = secondary_y)
+        indices = None
+        for key, index in (('name', self._names), ('type', self._types)):
+            if key in selector:
+                found = index.get(selector[key], [])
+                indices = found if indices is None else sorted(set(indices) & set(found))
+        return (self._data_objs[i] for i in list(indices))
+
+    @property
+    def data(self):
+        """The traces of this figure, as a tuple"""
+        return self["data"]
+
+    @data.setter
+    def data(self, new_data):
+        go.Figure.data.fset(self, new_data)
+        self._index_traces()
+
+    def add_traces(self, data, *args, **kwargs) -> 'Figure':
+        """Same as :meth:`plotly.graph_objects.Figure.add_traces`, also indexing the new traces"""
+        start = len(self._data_objs)
+        super().add_traces(data, *args, **kwargs)
+        self._index_traces(start)
+        return self
+
+    def _index_traces(self, start:int = 0) -> None:
+        # Indexes each trace from start onwards; starting from 0 rebuilds the whole index
+        if start == 0:
+            self._names: Dict[str, List[int]] = {}
+            self._types: Dict[str, List[int]] = {}
+            self._trace_names: List[str] = []
+            self._traces_3d: int = 0
+        for i in range(start, len(self._data_objs)):
+            trace = self._data_objs[i]
+            self._names.setdefault(trace.name, []).append(i)
+            self._types.setdefault(trace.type, []).append(i)
+            self._trace_names.append(trace.name)
+            self._traces_3d += trace.type in Figure._3d_types
+
+    @property
+    def budget(self) -> int:
+        """The most bytes this figure can be when sent, or None for no limit"""
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget:int):
+        self._budget = budget
+
+    @property
+    def budget_action(self) -> Literal['raise', 'downcast', 'decimate']:
+        """What to do when this figure is over its budget, as in :meth:`Figure.enforce_budget`"""
+        return self._budget_action
+
+    @budget_action.setter
+    def budget_action(self, budget_action:Literal['raise', 'downcast', 'decimate']):
+        self._budget_action = budget_action
+
+    def memory_usage(self) -> Dict[str, any]:
+        """
+        Measures the arrays in this figure, such as x, y, and z, and estimates how large it is when sent.
+        Arrays are sent in base64, taking about 4/3 of their bytes, and integers are sent in the smallest type that fits them.
+        Hidden traces, such as those added by :meth:`Figure.add_slider`, are sent too
+
+        :return usage: a dictionary of\n
+            \t traces: a dictionary for each trace of its index, name, type, visibility, bytes of arrays, estimated bytes when sent, and bytes of each array\n
+            \t nbytes: the bytes of every array in the traces and frames\n
+            \t serialized_bytes: the estimated bytes of this whole figure when sent\n
+            \t hidden_traces: the number of traces that are not visible\n
+            \t frames_nbytes, frames_serialized_bytes: the bytes of the arrays in the frames, and their estimated bytes when sent
+        """
+        traces, cache = [], {}
+        for i, trace in enumerate(self._data_objs):
+            entry = self._usage_cache.get(id(trace))
+            generation = getattr(trace, '_generation', 0)
+            if entry is None or entry[0] is not trace or entry[1] != generation:
+                arrays, serialized = Figure._measure(self._data[i])
+                entry = (trace, generation, dict(
+                    name = trace.name, type = trace.type, visible = trace.visible,
+                    nbytes = sum(arrays.values()), serialized_bytes = serialized, arrays = arrays
+                ))
+            cache[id(trace)] = entry
+            traces.append(dict(index = i) | entry[2])
+        self._usage_cache = cache
+        frames = [Figure._measure(frame._props) for frame in self._frame_objs]
+        frames_nbytes = sum(sum(arrays.values()) for arrays, _ in frames)
+        frames_serialized = sum(serialized for _, serialized in frames)
+        return dict(
+            traces = traces,
+            nbytes = sum(trace['nbytes'] for trace in traces) + frames_nbytes,
+            serialized_bytes = sum(trace['serialized_bytes'] for trace in traces) + Figure._measure(self._layout)[1] + frames_serialized,
+            hidden_traces = sum(trace['visible'] in (False, 'legendonly') for trace in traces),
+            frames_nbytes = frames_nbytes,
+            frames_serialized_bytes = frames_serialized,
+        )
+
+    @staticmethod
+    def _measure(props:dict) -> tuple:
+        # The bytes of each array, by its path such as 'marker.color', and the estimated bytes of everything when sent
+        arrays = {}
+        serialized = 0
+        def walk(props, path, skeleton):
+            nonlocal serialized
+            for name, value in props.items():
+                key = f'{path}{name}'
+                if isinstance(value, dict):
+                    skeleton[name] = {}
+                    walk(value, f'{key}.', skeleton[name])
+                    continue
+                if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value): # Such as the traces of a frame
+                    skeleton[name] = [{} for _ in value]
+                    for j, item in enumerate(value):
+                        walk(item, f'{key}[{j}].', skeleton[name][j])
+                    continue
+                if isinstance(value, (list, tuple)) and len(value) > 1 and not isinstance(value[0], (dict, list, tuple)):
+                    array = np.asarray(value)
+                    if array.dtype.kind not in 'biuf':
+                        skeleton[name] = value
+                        continue
+                    arrays[key] = array.nbytes
+                    serialized += len(to_json_plotly(value)) # Lists are not sent in base64
+                elif isinstance(value, np.ndarray) and value.dtype.kind in 'biuf':
+                    arrays[key] = value.nbytes
+                    if value.dtype.kind in 'iu' and value.size:
+                        value = value.astype(np.promote_types(np.min_scalar_type(value.min()), np.min_scalar_type(value.max())))
+                    serialized += Figure._base64_size(value) + 30 # and its dtype and shape
+                elif isinstance(value, np.ndarray):
+                    arrays[key] = value.nbytes
+                    skeleton[name] = value.tolist()
+                else:
+                    skeleton[name] = value
+        skeleton = {}
+        walk(props, '', skeleton)
+        return arrays, serialized + len(to_json_plotly(skeleton))
+
+    @staticmethod
+    def _base64_size(array:np.ndarray) -> int:
+        # Each 3 bytes are 4 characters, and each / is escaped in JSON as \u002f, 6 characters
+        raw = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+        groups = raw[:len(raw) // 3 * 3].reshape(-1, 3).astype(np.uint32)
+        bits = groups[:, 0] << 16 | groups[:, 1] << 8 | groups[:, 2]
+        slashes = sum(np.count_nonzero((bits >> shift & 63) == 63) for shift in (18, 12, 6, 0))
+        return 4 * math.ceil(len(raw) / 3) + 5 * int(slashes)
+
+    def enforce_budget(self, budget:int = None, action:Literal['raise', 'downcast', 'decimate'] = None) -> Dict[str, any]:
+        """
+        Makes sure this figure is no larger than a budget when sent.
+        Traces are changed in place; the frames of :meth:`Figure.add_animation` are only measured
+
+        Parameters
+        ----------
+        budget
+            The most bytes this figure can be when sent, as estimated by :meth:`Figure.memory_usage`. Defaults to this figure's budget
+        action
+            What to do when this figure is over its budget. Defaults to this figure's `budget_action`.\n
+            \t raise: raise a :class:`FigureBudgetError`\n
+            \t downcast: change float64 arrays to float32, and int64 arrays to int32 when they fit, then raise if still over\n
+            \t decimate: downcast, then keep every nth point of lines, scatters, surfaces, heatmaps, and contours, then raise if still over
+
+        :return usage: the :meth:`Figure.memory_usage` of this figure, once within its budget
+        """
+        budget = self._budget if budget is None else budget
+        action = action or self._budget_action
+        usage = self.memory_usage()
+        if budget is None or usage['serialized_bytes'] <= budget:
+            return usage
+        if action in ('downcast', 'decimate'):
+            self._downcast()
+            usage = self.memory_usage()
+        if action == 'decimate':
+            for _ in range(4): # Overhead that does not shrink can need another pass
+                if usage['serialized_bytes'] <= budget:
+                    break
+                decimated = [trace for trace in usage['traces'] if trace['type'] in Figure._line_types | Figure._grid_types]
+                shrinking = sum(trace['serialized_bytes'] for trace in decimated)
+                available = budget - (usage['serialized_bytes'] - shrinking)
+                if not decimated or available <= 0:
+                    break
+                ratio = shrinking / available
+                if not any([self._decimate(trace['index'], ratio) for trace in decimated]): # Every trace, not just until one is decimated
+                    break
+                usage = self.memory_usage()
+        if usage['serialized_bytes'] > budget:
+            raise FigureBudgetError(usage, budget)
+        return usage
+
+    def _downcast(self) -> None:
+        for i, trace in enumerate(self._data_objs):
+            for path in Figure._measure(self._data[i])[0]:
+                value = trace[path] if '[' not in path else None # Arrays in lists of dictionaries are left alone
+                if not isinstance(value, np.ndarray):
+                    continue
+                if value.dtype == np.float64:
+                    value = value.astype(np.float32)
+                elif value.dtype == np.int64 and value.size and np.iinfo(np.int32).min <= value.min() and value.max() <= np.iinfo(np.int32).max:
+                    value = value.astype(np.int32)
+                else:
+                    continue
+                trace[path] = None # Setting an equal value is skipped, even with a smaller type
+                trace[path] = value
+
+    def _decimate(self, i:int, ratio:float) -> bool:
+        # Keeps every nth point of a trace, with every array of one point per element sliced the same way
+        trace = self._data_objs[i]
+        paths = [path for path in Figure._measure(self._data[i])[0] if '[' not in path]
+        if trace.type in Figure._grid_types:
+            if trace.z is None or np.ndim(trace.z) != 2:
+                return False
+            rows, columns = np.shape(trace.z)
+            step = math.ceil(math.sqrt(ratio))
+            if step < 2 or min(rows, columns) < 4:
+                return False
+            def shrink(value):
+                shape = np.shape(value)
+                if shape == (rows, columns):
+                    return np.asarray(value)[::step, ::step]
+                if len(shape) == 1 and shape[0] in (rows, columns) and rows != columns:
+                    return np.asarray(value)[::step]
+                return None
+            updates = {path: shrink(trace[path]) for path in paths}
+            # With a square grid, 1D x has one point per column, and y one per row
+            for path in ('x', 'y'):
+                if path in paths and np.ndim(trace[path]) == 1 and rows == columns:
+                    updates[path] = np.asarray(trace[path])[::step]
+        else:
+            lengths = [len(trace[axis]) for axis in ('x', 'y', 'z') if axis in paths]
+            if not lengths:
+                return False
+            length = max(lengths)
+            step = math.ceil(ratio)
+            if step < 2 or length < 4:
+                return False
+            updates = {path: np.asarray(trace[path])[::step] for path in paths if np.ndim(trace[path]) == 1 and len(trace[path]) == length}
+        for path, value in updates.items():
+            if value is not None:
+                trace[path] = value
+        return True
+
+    def to_plotly_json(self) -> dict:
+        """
+        Same as :meth:`plotly.graph_objects.Figure.to_plotly_json`, which Dash uses to send figures,
+        but traces and layout that did not change since the last call reuse their converted form.
+        The dictionary, and the dictionary of each trace and of the layout, are new on every call, so their keys can be changed,
+        but values nested deeper, such as arrays and fonts, are shared with later calls and must not be modified.
+        With a budget, it is enforced first
+
+        :return figure: This figure as a dictionary
+        """
+        if self._budget is not None:
+            self.enforce_budget()
+        data = [dict(entry[2]) for entry in self._cached_traces()]
+        result = {"data": data, "layout": dict(self._cached_layout()[1])}
+        if self._frame_objs:
+            result["frames"] = deepcopy([frame._props for frame in self._frame_objs])
+            convert_to_base64(result["frames"])
+        return result
+
+    def to_json(self, *args, **kwargs) -> str:
+        """
+        Same as :meth:`plotly.graph_objects.Figure.to_json`.
+        Without any arguments, the JSON is put together from cached JSON of each trace and the layout,
+        using orjson if it is installed
+
+        :return json: This figure as a JSON string
+        """
+        if args or kwargs:
+            return super().to_json(*args, **kwargs)
+        if self._budget is not None:
+            self.enforce_budget()
+        traces = self._cached_traces()
+        for entry in traces:
+            if entry[3] is None:
+                entry[3] = to_json_plotly(entry[2])
+        layout = self._cached_layout()
+        if layout[2] is None:
+            layout[2] = to_json_plotly(layout[1])
+        frames = f',"frames":{to_json_plotly(self.to_plotly_json()["frames"])}' if self._frame_objs else ''
+        return f'{{"data":[{",".join(entry[3] for entry in traces)}],"layout":{layout[2]}{frames}}}'
+
+    def _cached_traces(self) -> List[list]:
+        # Each entry is [trace, generation, dictionary, json or None]
+        cache = {}
+        for i, trace in enumerate(self._data_objs):
+            entry = self._trace_cache.get(id(trace))
+            generation = getattr(trace, '_generation', 0)
+            if entry is None or entry[0] is not trace or entry[1] != generation:
+                props = deepcopy(self._data[i])
+                convert_to_base64(props)
+                entry = [trace, generation, props, None]
+            cache[id(trace)] = entry
+        self._trace_cache = cache # Removed traces are dropped
+        return list(cache.values())
+
+    def _cached_layout(self) -> list:
+        # [layout object and generation, dictionary, json or None]
+        key = (self._layout_obj, self._layout_generation)
+        if self._layout_cache is None or self._layout_cache[0][0] is not key[0] or self._layout_cache[0][1] != key[1]:
+            layout = deepcopy(self._layout)
+            convert_to_base64(layout)
+            self._layout_cache = [key, layout, None]
+        return self._layout_cache
+
+    def _perform_plotly_restyle(self, restyle_data, trace_indexes):
+        if trace_indexes is None:
+            trace_indexes = range(len(self._data_objs))
+        elif isinstance(trace_indexes, int):
+            trace_indexes = [trace_indexes]
+        for i in trace_indexes:
+            self._data_objs[i]._generation = next(_generations)
+        result = super()._perform_plotly_restyle(restyle_data, trace_indexes)
+        if 'name' in restyle_data: # Renamed without going through _restyle_child
+            for i in trace_indexes:
+                self._rename(i, self._data_objs[i].name)
+        return result
+
+    def _perform_plotly_relayout(self, relayout_data):
+        self._layout_generation = next(_generations)
+        return super()._perform_plotly_relayout(relayout_data)
+
+    def _relayout_child(self, child, key_path_str, val):
+        self._layout_generation = next(_generations)
+        super()._relayout_child(child, key_path_str, val)
+
+    def _restyle_child(self, child, key_path_str, val):
+        # Marks the trace as changed, and keeps the index up to date when a trace is renamed
+        child._generation = next(_generations)
+        super()._restyle_child(child, key_path_str, val)
+        if key_path_str == 'name' and child._trace_ind is not None:
+            self._rename(child._trace_ind, val)
+
+    def _rename(self, i:int, name:str) -> None:
+        if self._trace_names[i] == name:
+            return
+        old = self._names[self._trace_names[i]]
+        old.remove(i)
+        if not old:
+            del self._names[self._trace_names[i]]
+        bisect.insort(self._names.setdefault(name, []), i)
+        self._trace_names[i] = name
 
 class Surface(go.Surface):
     """
     A 3D Surface
     This extends :class:`plotly.graph_objects.Figure`.
     """
-    def __init__(self, x:np.ndarray[np.floating], y:np.ndarray[np.floating], z:np.ndarray[np.floating], showscale:bool = False, **kwargs):
+    def __init__(self, x:np.ndarray[np.floating], y:np.ndarray[np.floating], z:np.ndarray[np.floating], showscale:bool = False, compress_grid:bool = True, **kwargs):
         """
         Creates a 3D surface
 
@@ -108,12 +607,138 @@ class Surface(go.Surface):
         ----------
         x,y,z
             2D arrays all of the same shape. 
-            Each ordered triple is a point on the surface
+            Each ordered triple is a point on the surface.
+            Alternatively, x and y can be 1D arrays of the grid's axes, with z of shape (len(y), len(x))
         showscale
             Whether to show the colorbar on the side
+        compress_grid
+            Whether to replace 2D x and y made by ``np.meshgrid(x, y)`` with their 1D axes, which draw the same surface.
+            Surfaces on the same grid then only send its axes, instead of two full 2D arrays each
         """
+        if compress_grid:
+            x, y = Surface.grid_axes(x, y)
         super().__init__(x = x, y = y, z = z, showscale = showscale, **kwargs)
 
+    @classmethod
+    def from_expression(cls, expression:str, x:np.ndarray[np.floating], y:np.ndarray[np.floating], variables:Dict[str, any] = {}, cache:ArrayCache = None, **kwargs) -> 'Surface':
+        """
+        Creates a 3D surface z = f(x, y) from an expression
+
+        Parameters
+        ----------
+        expression
+            A normal math expression of x and y, as used by :func:`P3D.expressions.evaluate`
+        x,y
+            1D arrays of the grid's axes
+        variables
+            dictionary of the names and values of any other variables in the expression
+        cache
+            An :class:`P3D.cache.ArrayCache` to load z from if it was computed before, by this or any other process
+        kwargs
+            other properties of the surface, as in :class:`Surface`
+
+        :return surface: the surface, with z of shape (len(y), len(x))
+        """
+        x = np.asarray(x, dtype = np.float64)
+        y = np.asarray(y, dtype = np.float64)
+        def compute():
+            z = evaluate(expression, variables | {'x': x[None, :], 'y': y[:, None]})
+            return np.broadcast_to(np.asarray(z, dtype = np.float64), (len(y), len(x))) # Expressions without x or y give fewer dimensions
+        if cache is None:
+            z = compute()
+        else:
+            z = cache.get_or_compute(ArrayCache.key('Surface', expression, variables, x, y), compute)
+        return cls(x, y, z, **kwargs)
+
+    @staticmethod
+    def grid_axes(x:np.ndarray[np.floating], y:np.ndarray[np.floating]) -> tuple:
+        """
+        Finds the 1D axes of 2D x and y made by ``np.meshgrid(x, y)``,
+        where each row of x is the same, and each column of y is the same.
+        Grids made with ``indexing = 'ij'`` are not compressed, since z would need to be transposed
+
+        Parameters
+        ----------
+        x,y
+            2D arrays of the same shape
+
+        :return axes: the 1D x and y axes, or x and y unchanged if they are not such a grid
+        """
+        if not (isinstance(x, np.ndarray) and isinstance(y, np.ndarray)) or x.ndim != 2 or x.shape != y.shape:
+            return x, y
+        if np.array_equal(x, np.broadcast_to(x[:1, :], x.shape)) and np.array_equal(y, np.broadcast_to(y[:, :1], y.shape)):
+            return x[0, :].copy(), y[:, 0].copy()
+        return x, y
+
+class ImplicitSurface():
+    """
+    An implicit surface, such as x^2 + y^2 + z^2 = 1, drawn as a :class:`plotly.graph_objects.Mesh3d`.
+    The values of the expression on the grid are kept, so changing the level does not evaluate it again
+    """
+    def __init__(self, expression:str, x:np.ndarray[np.floating], y:np.ndarray[np.floating], z:np.ndarray[np.floating], variables:Dict[str, any] = {}, chunk:int = 16, dtype:type = np.float32, cache:ArrayCache = None):
+        """
+        Evaluates an implicit surface on a grid
+
+        Parameters
+        ----------
+        expression
+            A normal math expression of x, y, and z, as used by :func:`P3D.expressions.evaluate`.
+            If it has an =, the surface is where both sides are equal, otherwise where the expression equals the level given to :meth:`ImplicitSurface.mesh`
+        x,y,z
+            1D arrays of the grid's axes
+        variables
+            dictionary of the names and values of any other variables in the expression
+        chunk
+            the number of grid slices along x evaluated and meshed at once, which limits the memory used for large grids
+        dtype
+            the type the values on the grid are kept as; the default float32 uses half the memory of float64
+        cache
+            An :class:`P3D.cache.ArrayCache` to load the values on the grid from if they were computed before, by this or any other process
+        """
+        self.x = np.asarray(x, dtype = np.float64)
+        self.y = np.asarray(y, dtype = np.float64)
+        self.z = np.asarray(z, dtype = np.float64)
+        self.chunk: int = chunk
+        if '=' in expression:
+            left, right = expression.split('=', 1)
+            expression = f'({left}) - ({right})'
+        self.expression: str = expression
+        if cache is None:
+            self.field: np.ndarray = self._evaluate(variables, dtype)
+        else: # Read-only and memory-mapped, so every process shares the same memory
+            key = ArrayCache.key('ImplicitSurface', expression, variables, self.x, self.y, self.z, dtype)
+            self.field = cache.get_or_compute(key, lambda: self._evaluate(variables, dtype))
+
+    def _evaluate(self, variables:Dict[str, any], dtype:type) -> np.ndarray:
+        field = np.empty((len(self.x), len(self.y), len(self.z)), dtype = dtype)
+        for start in range(0, len(self.x), self.chunk):
+            field[start:start + self.chunk] = evaluate(self.expression, variables | {
+                'x': self.x[start:start + self.chunk, None, None],
+                'y': self.y[None, :, None],
+                'z': self.z[None, None, :]
+            })
+        return field
+
+    def mesh(self, level:float = 0, **kwargs) -> go.Mesh3d:
+        """
+        Creates the mesh of where the expression equals a level
+
+        Parameters
+        ----------
+        level
+            the value of the expression on the surface
+        kwargs
+            other properties of the :class:`plotly.graph_objects.Mesh3d`, such as color or opacity
+
+        :return mesh: the surface as a :class:`plotly.graph_objects.Mesh3d`
+        """
+        vertices, faces = marching_tetrahedra(self.field, self.x, self.y, self.z, level, self.chunk)
+        return go.Mesh3d(
+            x = vertices[:, 0], y = vertices[:, 1], z = vertices[:, 2],
+            i = faces[:, 0], j = faces[:, 1], k = faces[:, 2],
+            **kwargs
+        )
+
 class Line():
     def __new__(cls, x:np.ndarray[np.floating], y:np.ndarray[np.floating], z:np.ndarray[np.floating] = None, **kwargs):
         """
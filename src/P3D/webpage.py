@@ -1,25 +1,364 @@
-from dash import Dash, dash_table, dcc, Input, Output, html, State
+from dash import Dash, dash_table, dcc, Input, Output, html, State, no_update
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+import flask
+import queue
+import threading
 import numpy as np
 import numexpr as ne
-from typing import List, Union, Dict, Callable
+from typing import List, Union, Dict, Callable, Literal
 import sympy as sp
-import re
 import random
 import string
-from sympy.parsing.sympy_parser import (
-    parse_expr,
-    standard_transformations,
-    implicit_multiplication_application,
-    convert_xor,
-)
+import os
+import atexit
+import base64
+import tempfile
+import gzip
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import expressions
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError: # Not available on Windows
+    BaseApplication = None
+try:
+    import waitress
+except ImportError:
+    waitress = None
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
 
 class Webpage(Dash):
     """A Dash webpage, extends :dash:`dash.Dash<dash>`"""
-    def __init__(self, **kwargs):
-        """Creates A Dash webpage"""
+    _compressible = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+    _static_paths = ('_dash-component-suites/', 'assets/')
+    def __init__(self, compression: Union[bool, List[str]] = False, compression_level: Dict[str, int] = {}, compression_threshold: int = 1024, merge_callbacks: bool = False, cache_layout: bool = False, **kwargs):
+        """
+        Creates A Dash webpage
+
+        Parameters
+        ----------
+        compression
+            Whether to compress responses, such as figures sent by callbacks.
+            Can also be a list of encodings to use, in order of preference, out of ``'br'``, ``'zstd'``, and ``'gzip'``.
+            True uses every available encoding; ``'br'`` needs the brotli package, and ``'zstd'`` needs the zstandard package
+        compression_level
+            The compression level for each encoding, such as ``{'gzip': 9}``.
+            Defaults to 4 for br (0 to 11), 3 for zstd (1 to 22), and 6 for gzip (1 to 9)
+        compression_threshold
+            Responses smaller than this many bytes are not compressed
+        merge_callbacks
+            Whether events with the same inputs, such as :meth:`Button.on_click` and :meth:`Interval.on_tick`, are handled together
+            in one callback, so that each event is one request instead of one for each handler.
+            Only the outputs of handlers that did not raise :class:`dash.exceptions.PreventUpdate` are sent back
+        cache_layout
+            Whether to serialize the layout once, instead of for every visit, and send it with an ETag,
+            so browsers that already have it are told it has not changed instead of being sent it again.
+            The layout is serialized again when ``app.layout`` is set to something else;
+            changes made inside the layout, such as to a figure in it, need :meth:`Webpage.invalidate_layout`.
+            Layouts that are functions are never cached
+        """
         super().__init__(**kwargs)
+        self.merge_callbacks: bool = merge_callbacks
+        self._handlers: Dict[tuple, list] = {}
+        self._handlers_lock = threading.Lock()
+        self.cache_layout: bool = cache_layout
+        self._layout_cache: tuple = None # The layout, number of extra components, serialized layout, and its ETag
+        self._layout_lock = threading.Lock()
+        available = [encoding for encoding, module in (('br', brotli), ('zstd', zstandard), ('gzip', gzip)) if module]
+        if compression is True:
+            compression = available
+        elif compression:
+            missing = set(compression) - set(available)
+            if missing:
+                raise ValueError(f"Compression encodings {sorted(missing)} are not available; install brotli for 'br' and zstandard for 'zstd'")
+        self.compression: List[str] = list(compression or [])
+        self.compression_level: Dict[str, int] = {'br': 4, 'zstd': 3, 'gzip': 6} | compression_level
+        self.compression_threshold: int = compression_threshold
+        self._compression_stats: Dict[str, float] = dict(responses = 0, cache_hits = 0, bytes_in = 0, bytes_out = 0, seconds = 0)
+        self._compressed_static: Dict[tuple, bytes] = {}
+        self._compression_lock = threading.Lock()
+        if self.compression:
+            self.server.after_request(self._compress)
+
+    def add_callback(self, func: Callable, outputs: List[List[str]] = [], inputs: List[List[str]] = [], states: List[List[str]] = [], starting_call: bool = False):
+        """
+        Calls `func` whenever any input is modified, like :meth:`dash.Dash.callback`.
+        With `merge_callbacks`, handlers with the same inputs and `starting_call` are combined into one callback when the webpage first starts
+
+        Parameters
+        ----------
+        func
+            the function to call, with 1 argument for each input and then each state, in order.
+            `func` should return one value for each output given, in order
+        outputs, inputs, states
+            Lists of outputs, inputs, and states. Each element should be in the style ['component_id', 'component_property']
+        starting_call
+            whether to call this event on load of the webpage
+        """
+        with self._handlers_lock:
+            if not self.merge_callbacks or self._got_first_request['setup_server']:
+                _callback(self, func, outputs, inputs, states, starting_call)
+                return
+            key = (tuple(tuple(input) for input in inputs), starting_call)
+            self._handlers.setdefault(key, []).append((func, [tuple(output) for output in outputs], [tuple(state) for state in states]))
+
+    def _setup_server(self):
+        if self._got_first_request['setup_server']:
+            return super()._setup_server()
+        # Several threads can take the first requests at once, so only the first merges the handlers,
+        # and the others wait for it to finish setting up the server before answering
+        with self._handlers_lock:
+            pending, self._handlers = self._handlers, {}
+            for (inputs, starting_call), handlers in pending.items():
+                # Handlers writing to an output already written to by another handler get their own callback
+                merged, written = [], set()
+                for func, outputs, states in handlers:
+                    if written.isdisjoint(outputs):
+                        merged.append((func, outputs, states))
+                        written.update(outputs)
+                    else:
+                        _callback(self, func, outputs, inputs, states, starting_call)
+                if len(merged) == 1:
+                    _callback(self, merged[0][0], merged[0][1], inputs, merged[0][2], starting_call)
+                elif merged:
+                    self._merge(merged, inputs, starting_call)
+            super()._setup_server()
+
+    def _merge(self, handlers: list, inputs: tuple, starting_call: bool):
+        outputs = [output for _, handler_outputs, _ in handlers for output in handler_outputs]
+        states = list(dict.fromkeys(state for _, _, handler_states in handlers for state in handler_states))
+        def callback(*args):
+            values = dict(zip(states, args[len(inputs):]))
+            results = []
+            for func, handler_outputs, handler_states in handlers:
+                try:
+                    result = func(*args[:len(inputs)], *[values[state] for state in handler_states])
+                except PreventUpdate:
+                    result = [no_update] * len(handler_outputs)
+                else:
+                    if len(handler_outputs) == 1:
+                        result = [result]
+                    elif not handler_outputs:
+                        result = []
+                results.extend(result)
+            if all(result is no_update for result in results):
+                raise PreventUpdate
+            return results
+        _callback(self, callback, outputs, inputs, states, starting_call, single = False)
+
+    def serve_layout(self):
+        if not self.cache_layout or self._layout_is_function or self._hooks.get_hooks('layout'):
+            return super().serve_layout()
+        with self._layout_lock:
+            cache = self._layout_cache
+            if cache is None or cache[0] is not self._layout or cache[1] != len(self._extra_components):
+                data = super().serve_layout().get_data()
+                cache = self._layout_cache = (self._layout, len(self._extra_components), data, hashlib.sha256(data).hexdigest()[:32])
+        _, _, data, etag = cache
+        if flask.request.if_none_match.contains(etag):
+            response = flask.Response(status = 304)
+        else:
+            response = flask.Response(data, mimetype = 'application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache' # Browsers check the ETag on every visit
+        return response
+
+    def invalidate_layout(self) -> None:
+        """Serializes the layout again on the next visit, after changes made inside it when using `cache_layout`"""
+        with self._layout_lock:
+            self._layout_cache = None
+
+    _thread_variables = ('NUMEXPR_NUM_THREADS', 'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+    @staticmethod
+    def _limit_threads(compute_threads: int) -> None:
+        # Libraries loaded later read these when they start
+        for variable in Webpage._thread_variables:
+            os.environ[variable] = str(compute_threads)
+        # numexpr, and the BLAS and OpenMP libraries NumPy already loaded, have to be set directly
+        ne.set_num_threads(compute_threads)
+        if threadpool_limits:
+            threadpool_limits(compute_threads)
+
+    def serve(self, host: str = '127.0.0.1', port: int = 8050, workers: int = None, threads: int = 4, compute_threads: int = None,
+              timeout: float = 120, graceful_timeout: float = 30, max_requests: int = 0, server: Literal['auto', 'gunicorn', 'waitress'] = 'auto', **options) -> None:
+        """
+        Serves this webpage for production, instead of the development server of :meth:`dash.Dash.run`.
+        Uses gunicorn, with several worker processes forked from this one after the app is fully created,
+        so they share the memory of everything made before calling this.
+        Where gunicorn is not available, such as on Windows, uses waitress, with one process.
+        Install either with ``pip install P3D[serve]``.
+        With gunicorn, sending SIGHUP to this process replaces the workers with new ones without dropping any requests
+
+        Parameters
+        ----------
+        host
+            the address to listen on; the default only accepts connections from this computer,
+            and ``'0.0.0.0'`` listens on every network interface
+        port
+            the port to listen on
+        workers
+            the number of worker processes. Defaults to the number of CPUs, or 1 if the webpage has a :class:`Stream`,
+            as a Stream's updates only reach webpages connected to the process that published them
+        threads
+            the number of requests each worker handles at once. Each webpage receiving a :class:`Stream` holds one thread
+            for as long as it is open, so with Streams this must be more than the number of webpages open at once
+        compute_threads
+            the number of threads numexpr, OpenMP, OpenBLAS, and MKL use in each worker, so that workers do not fight over CPUs.
+            Defaults to the number of CPUs divided by the number of workers.
+            NumPy loads its BLAS library when imported, so BLAS and OpenMP are only limited when threadpoolctl is installed,
+            which ``pip install P3D[serve]`` includes
+        timeout
+            workers taking more than this many seconds on one request are restarted
+        graceful_timeout
+            the seconds workers are given to finish their requests when stopping or reloading
+        max_requests
+            workers are restarted after this many requests, which limits memory leaks. Set to 0 to never restart them
+        server
+            which server to use; ``'auto'`` uses gunicorn if it is available, and waitress if not
+        options
+            other gunicorn or waitress settings, such as ``keepalive = 5``
+        """
+        cpus = os.cpu_count() or 1
+        if server == 'auto':
+            server = 'gunicorn' if BaseApplication else 'waitress'
+        if server == 'gunicorn' and BaseApplication is None:
+            raise ImportError('gunicorn is needed to serve with it, and is not available on Windows; install it with pip install gunicorn')
+        if server == 'waitress' and waitress is None:
+            raise ImportError('waitress is needed to serve with it; install it with pip install waitress')
+        # Stream updates only reach webpages connected to the process that published them
+        streams = any(rule.endpoint.startswith('p3d-stream-') for rule in self.server.url_map.iter_rules())
+        if streams and (workers or 1) > 1:
+            raise ValueError(f'Streams only reach webpages connected to the same process, so they need workers = 1, got {workers}')
+        if streams and threads < 2:
+            raise ValueError(f'Each webpage receiving a Stream holds one thread for as long as it is open, so threads must be more than the number of open webpages, got {threads}')
+        workers = workers or (cpus if server == 'gunicorn' and not streams else 1)
+        compute_threads = compute_threads or max(1, cpus // workers)
+        Webpage._limit_threads(compute_threads)
+        if server == 'waitress':
+            waitress.serve(self.server, host = host, port = port, threads = threads, **options)
+            return
+        def post_fork(arbiter, worker):
+            Webpage._limit_threads(compute_threads)
+        settings = dict(
+            bind = f'{host}:{port}',
+            workers = workers,
+            threads = threads,
+            worker_class = 'gthread' if threads > 1 else 'sync',
+            preload_app = True,
+            timeout = timeout,
+            graceful_timeout = graceful_timeout,
+            max_requests = max_requests,
+            max_requests_jitter = max_requests // 10, # So that workers do not all restart at once
+            post_fork = post_fork,
+        ) | options
+        app = self
+        class Application(BaseApplication):
+            def load_config(self):
+                for name, value in settings.items():
+                    self.cfg.set(name, value)
+
+            def load(self):
+                return app.server
+        Application().run()
+
+    @property
+    def compression_stats(self) -> Dict[str, float]:
+        """
+        Statistics on compressed responses: the number of responses, how many were static files already compressed,
+        bytes before and after compression, the compression ratio, and the seconds spent compressing
+        """
+        with self._compression_lock:
+            stats = dict(self._compression_stats)
+        stats['ratio'] = stats['bytes_in'] / stats['bytes_out'] if stats['bytes_out'] else 1
+        return stats
+
+    def _compress(self, response: flask.Response) -> flask.Response:
+        path = flask.request.path[len(self.config.routes_pathname_prefix):]
+        static = path.startswith(Webpage._static_paths)
+        if (response.status_code != 200 or ((response.is_streamed or response.direct_passthrough) and not static)
+                or 'Content-Encoding' in response.headers or not response.mimetype.startswith(Webpage._compressible)):
+            return response
+        response.vary.add('Accept-Encoding')
+        accepted = flask.request.accept_encodings
+        encoding = next((encoding for encoding in self.compression if accepted[encoding]), None)
+        if encoding is None:
+            return response
+        response.direct_passthrough = False # Assets are sent straight from their file unless read here
+        data = response.get_data()
+        if len(data) < self.compression_threshold:
+            return response
+        etag, weak = response.get_etag()
+        if etag:
+            # Each encoding is a different representation, so it needs its own ETag
+            etag = f'{etag}-{encoding}'
+            response.set_etag(etag, weak)
+            if flask.request.if_none_match.contains_weak(etag) if weak else flask.request.if_none_match.contains(etag):
+                response.status_code = 304
+                response.set_data(b'')
+                response.headers.pop('Content-Length', None)
+                return response
+        # Static files and the cached layout only change with their ETag, so they are only compressed once
+        key = (path, encoding, etag or len(data)) if static or (etag and path == '_dash-layout') else None
+        start = time.perf_counter()
+        compressed = self._compressed_static.get(key) if key else None
+        hit = compressed is not None
+        if not hit:
+            level = self.compression_level[encoding]
+            if encoding == 'br':
+                compressed = brotli.compress(data, quality = level)
+            elif encoding == 'zstd':
+                compressed = zstandard.ZstdCompressor(level = level).compress(data)
+            else:
+                compressed = gzip.compress(data, compresslevel = level, mtime = 0)
+            if key:
+                with self._compression_lock:
+                    if path == '_dash-layout': # Only the latest layout is kept, not every layout ever served
+                        for old in [old for old in self._compressed_static if old[0] == path and old[1] == encoding]:
+                            del self._compressed_static[old]
+                    self._compressed_static[key] = compressed
+        with self._compression_lock:
+            stats = self._compression_stats
+            stats['responses'] += 1
+            stats['cache_hits'] += hit
+            stats['bytes_in'] += len(data)
+            stats['bytes_out'] += len(compressed)
+            stats['seconds'] += time.perf_counter() - start
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
     
+def _callback(app: Dash, func: Callable, outputs: List[List[str]], inputs: List[List[str]], states: List[List[str]], starting_call: bool, single: bool = True):
+    # Without single, the outputs are given as a list, so even 1 output is returned in a list
+    outputs = [Output(output[0], output[1]) for output in outputs]
+    @app.callback(
+        *(outputs if single or not outputs else [outputs]),
+        *[Input(input[0], input[1]) for input in inputs],
+        *[State(state[0], state[1]) for state in states],
+        prevent_initial_call = not starting_call
+    )
+    def callback(*args):
+        return func(*args)
+
+def _add_callback(app: Dash, func: Callable, outputs: List[List[str]], inputs: List[List[str]], states: List[List[str]], starting_call: bool):
+    if isinstance(app, Webpage):
+        app.add_callback(func, outputs, inputs, states, starting_call)
+    else:
+        _callback(app, func, outputs, inputs, states, starting_call)
+
 class Graph(dcc.Graph):
     """Graph component for webpage, extends :dcc:`dash.dcc.Graph<graph>`"""
     def __init__(self, figure: go.Figure = None, id:str = None, height: float = None, **kwargs):
@@ -115,10 +454,20 @@ class DataTable(dash_table.DataTable):
             style_table = style_table | kwargs["style_table"]
         super().__init__(columns=column_data, data=row_data, style_table= style_table, **kwargs)
 
-class TextArea(dcc.Textarea):
+class _TextAreaMeta(type(dcc.Textarea)):
+    # Keeps TextArea.numexpr_threshold as an alias of P3D.expressions.numexpr_threshold
+    @property
+    def numexpr_threshold(cls) -> int:
+        return expressions.numexpr_threshold
+
+    @numexpr_threshold.setter
+    def numexpr_threshold(cls, value: int):
+        expressions.numexpr_threshold = value
+
+class TextArea(dcc.Textarea, metaclass = _TextAreaMeta):
     """A text input area, extends :dcc:`dash.dcc.TextArea<textarea>`"""
-    _symbols = {'sin', 'cos', 'ln', 'pi', 'exp', 'log'}
-    _transforms = standard_transformations + (convert_xor, implicit_multiplication_application)
+    _symbols = expressions._symbols
+    _transforms = expressions._transforms
     def __init__(self, value:str = None, id:str = None, height:float = None, **kwargs):
         """
         Creates A text input area
@@ -147,7 +496,7 @@ class TextArea(dcc.Textarea):
     @staticmethod
     def convert(text:str, as_string: bool = True) -> Union[str, sp.Expr]:
         """
-        Converts a normal math expression to a Python math expression
+        Converts a normal math expression to a Python math expression, see :func:`P3D.expressions.convert`
 
         Parameters
         ----------
@@ -156,16 +505,25 @@ class TextArea(dcc.Textarea):
         as_string
             whether to return the raw sympy expression output, or the string output
         """
-        names = set(re.findall(r"[A-Za-z_]\w*", text)) - TextArea._symbols
-        local_dict = {name: sp.Symbol(name) for name in names}
-        text = parse_expr(text, local_dict, TextArea._transforms)
-        return str(text) if as_string else text
-    
+        return expressions.convert(text, as_string)
+
+    @staticmethod
+    def numexpr_supported(text:str) -> bool:
+        """
+        Whether a normal math expression can be evaluated by numexpr, see :func:`P3D.expressions.numexpr_supported`
+
+        Parameters
+        ----------
+        text
+            the math expression to check
+        """
+        return expressions.numexpr_supported(text)
+
     @staticmethod
-    def evaluate(text:str, variables:Dict[str, any]) -> any:
+    def evaluate(text:str, variables:Dict[str, any], backend:Literal['auto', 'numexpr', 'numpy', 'math'] = 'auto') -> any:
         """
         Evaluates a normal math expression using the values
-        of the variables given.
+        of the variables given, see :func:`P3D.expressions.evaluate`
 
         Parameters
         ----------
@@ -173,9 +531,10 @@ class TextArea(dcc.Textarea):
             the math expression to evaluate
         variables
             dictionary of variables names and their values
+        backend
+            how to evaluate the expression; one of ``'auto'``, ``'numexpr'``, ``'numpy'``, or ``'math'``
         """
-        variables['pi'] = np.pi
-        return ne.evaluate(TextArea.convert(text), variables)
+        return expressions.evaluate(text, variables, backend)
     
     @staticmethod
     def latex(text) -> str:
@@ -187,7 +546,7 @@ class TextArea(dcc.Textarea):
         text
             the math expression to convert        
         """
-        return sp.latex(TextArea.convert(text, as_string = False))
+        return expressions.latex(text)
     
     def create_Markdown(self, app : Dash, id:str = None, height:float = None, **kwargs) -> dcc.Markdown:
         """
@@ -223,7 +582,7 @@ class TextArea(dcc.Textarea):
     
 class Slider(dcc.Slider):
     """A text input area, extends :dcc:`dash.dcc.Slider<slider>`"""
-    def __init__(self, min: float = 0, max: float = 1, value : float = None, step: float = None, marks : Union[dict, None] = dict(), id: str = None, **kwargs):
+    def __init__(self, min: float = 0, max: float = 1, value : float = None, step: float = None, marks : Union[dict, None] = dict(), id: str = None, throttle: int = None, **kwargs):
         """
         Creates A Dash Slider
         
@@ -239,6 +598,9 @@ class Slider(dcc.Slider):
             optional dictionary to provide exact steps and labels; set to None for no labels at all
         id
             the unique id to identify this slider with
+        throttle
+            if given, the minimum number of milliseconds between calls of :meth:`Slider.on_change` while dragging.
+            The last value is always sent once dragging pauses
         """
         kwargs["updatemode"] =  kwargs.get("updatemode", "drag")
         if id:
@@ -250,6 +612,98 @@ class Slider(dcc.Slider):
                 "always_visible": False
             })
         super().__init__(min = min, max = max, marks = marks, **kwargs)
+        self.throttle: int = throttle
+        self._throttled: bool = False
+        if throttle:
+            self.throttled_id:str = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+            self.throttled: dcc.Store = dcc.Store(id = self.throttled_id, data = dict(value = value, seq = 0, session = None))
+
+    def on_change(self, app: Dash, func: Callable, outputs: List[List[str]] = [], other_inputs: List[List[str]] = [], states: List[List[str]] = [], starting_call: bool = False):
+        """
+        What to do when this slider's value changes.
+        If this slider is throttled, calls are limited to one every `throttle` milliseconds,
+        and while a call is running, only the latest value from the same webpage waits to run next; older values are skipped
+
+        Parameters
+        ----------
+        app
+            the :dash:`dash.Dash<dash>` app that has this slider and handles this event
+        func
+            the actual function to be used on change. The function arguments, in the given order, have to be:\n
+            \t the value of this slider (1 argument)\n
+            \t other provided inputs (1 argument for each, in order)\n
+            \t any provided states (1 argument for each, in order)\n
+            `func` should return one value for each output given, in order
+        outputs
+            List of outputs. Each element should be in the style ['component_id', 'component_property']
+        states, other_inputs
+            List of any states to use or additional inputs. Both states and inputs are used as arguments, but this event will be called whenever any input is modified, but not when any state is modified. Same style as `outputs`
+        starting_call
+            whether to call this event on load of the webpage
+        """
+        if not self.throttle:
+            @app.callback(
+                *[Output(output[0], output[1]) for output in outputs],
+                Input(self.id, 'value'),
+                *[Input(input[0], input[1]) for input in other_inputs],
+                *[State(state[0], state[1]) for state in states],
+                prevent_initial_call = not starting_call
+            )
+            def callback(*args):
+                return func(*args)
+            return
+        if not self._throttled: # Only one throttle is needed, however many handlers there are
+            self._throttled = True
+            app.clientside_callback(
+                f"""
+                function(value) {{
+                    const all = window._p3dThrottles = window._p3dThrottles || {{}};
+                    const s = all['{self.throttled_id}'] = all['{self.throttled_id}'] || {{
+                        last: 0, timer: null, seq: 0, session: Math.random().toString(36).slice(2)
+                    }};
+                    const send = function() {{
+                        s.last = Date.now();
+                        s.timer = null;
+                        s.seq += 1;
+                        dash_clientside.set_props('{self.throttled_id}', {{data: {{value: s.value, seq: s.seq, session: s.session}}}});
+                    }};
+                    s.value = value;
+                    const wait = {self.throttle} - (Date.now() - s.last);
+                    if (wait <= 0) {{
+                        clearTimeout(s.timer);
+                        send();
+                    }} else if (!s.timer) {{
+                        s.timer = setTimeout(send, wait);
+                    }}
+                }}
+                """,
+                Input(self.id, 'value'),
+                prevent_initial_call = True
+            )
+        sessions: Dict[str, list] = {} # Latest value number and lock for each webpage
+        sessions_lock = threading.Lock()
+        @app.callback(
+            *[Output(output[0], output[1]) for output in outputs],
+            Input(self.throttled_id, 'data'),
+            *[Input(input[0], input[1]) for input in other_inputs],
+            *[State(state[0], state[1]) for state in states],
+            prevent_initial_call = not starting_call
+        )
+        def callback(data, *args):
+            if data['session'] is None: # Initial call, before any dragging
+                return func(data['value'], *args)
+            with sessions_lock:
+                session = sessions.setdefault(data['session'], [0, threading.Lock()])
+                session[0] = max(session[0], data['seq'])
+            with session[1]: # One call at a time for each webpage
+                if session[0] > data['seq']: # A newer value arrived while waiting
+                    raise PreventUpdate
+                try:
+                    return func(data['value'], *args)
+                finally:
+                    with sessions_lock:
+                        if session[0] == data['seq'] and sessions.get(data['session']) is session:
+                            del sessions[data['session']]
 
 class Button(html.Button):
     """A button, extends :html:`dash.html.Button<button>`"""
@@ -293,15 +747,7 @@ class Button(html.Button):
         starting_call
             whether to call this event on load of the webpage
         """
-        @app.callback(
-            *[Output(output[0], output[1]) for output in outputs],
-            Input(self.id, 'n_clicks'),
-            *[Input(input[0], input[1]) for input in other_inputs],
-            *[State(state[0], state[1]) for state in states],
-            prevent_initial_call = not starting_call
-        )
-        def callback(*args):
-            return func(*args)
+        _add_callback(app, func, outputs, [[self.id, 'n_clicks']] + other_inputs, states, starting_call)
         
 class Interval(dcc.Interval):
     """A ticking interval, extends :dcc:`dash.dcc.Interval<interval>`"""
@@ -332,6 +778,10 @@ class Interval(dcc.Interval):
             kwargs['id'] = id
         super().__init__(interval = ms, disabled = disabled, max_intervals = max_intervals, **kwargs)
         self.value: dcc.Store = dcc.Store(id = self.value_id, data = value)
+        self._register_tick(app)
+
+    def _register_tick(self, app: Dash) -> None:
+        # How the value changes on each tick; subclasses can change it without changing on_tick
         @app.callback(
             Output(self.value_id, 'data', allow_duplicate=True),
             Input(self.id, 'n_intervals'),
@@ -362,15 +812,295 @@ class Interval(dcc.Interval):
         starting_call
             whether to call this event on load of the webpage
         """
+        _add_callback(app, func, outputs, [[self.value_id, 'data']] + other_inputs, states, starting_call)
+
+class Animation(Interval):
+    """
+    An animation of a graph's traces, played by the webpage at a steady rate, extends :class:`Interval`.
+    Instead of computing one frame on each tick, the server computes the next batch of frames at once,
+    and the webpage keeps them until they are played, asking for more before they run out.
+    The size of each batch grows and shrinks with how long the server takes to answer
+    """
+    _types = ('f8', 'f4', 'i1', 'u1', 'i2', 'u2', 'i4', 'u4') # Those that JavaScript has typed arrays for
+    def __init__(self, app: Dash, graph_id: str, func: Callable, traces: List[int] = None, id: str = None, fps: float = 20, value: float = 0, step: float = 1, batch: int = 4, max_batch: int = 64, disabled: bool = False, max_intervals: int = -1, **kwargs):
+        """
+        Creates an Animation
+
+        Parameters
+        ----------
+        app
+            the :dash:`dash.Dash<dash>` app that has this animation and computes its frames
+        graph_id
+            the id of the :class:`Graph` to animate
+        func
+            function computing a batch of frames. Its argument is a 1D array of the values of each frame, such as times.
+            It should return a dictionary of the properties to change, such as ``dict(z = Z)``,
+            where each value is an array with one frame along its first axis, like the values.
+            It can also return a list of such dictionaries, one for each trace in `traces`
+        traces
+            The indices of the traces in the graph that each frame changes. Defaults to the first traces, one for each dictionary
+        id
+            the unique id to identify this animation with
+        fps
+            How many frames to play each second
+        value
+            the value of the first frame
+        step
+            how much the value changes from one frame to the next
+        batch
+            the number of frames asked for at first, and at least, in each batch
+        max_batch
+            the most frames asked for in one batch
+        disabled
+            disabled means the animation does not begin playing right away; the first batch is still computed
+        max_intervals
+            the max number of frames to play. Set to -1 for infinite
+        """
+        if not id:
+            id = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+        self.graph_id: str = graph_id
+        self.func: Callable = func
+        self.traces: List[int] = traces
+        self.fps: float = fps
+        self.start: float = value
+        self.batch: int = batch
+        self.max_batch: int = max_batch
+        self.request_id: str = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+        self.frames_id: str = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+        self.request: dcc.Store = dcc.Store(id = self.request_id)
+        self.frames: dcc.Store = dcc.Store(id = self.frames_id)
+        super().__init__(app, id = id, ms = max(1, round(1000 / fps)), disabled = disabled, value = value, max_intervals = max_intervals, step = step, **kwargs)
+
+    @property
+    def stores(self) -> List[dcc.Store]:
+        """The stores this animation needs in the layout, next to it: its value, its requests for frames, and the frames"""
+        return [self.value, self.request, self.frames]
+
+    def _register_tick(self, app: Dash) -> None:
+        # The value changes when the webpage plays a frame, instead of on the server
+        app.clientside_callback(
+            f"""
+            function(n) {{
+                const all = window._p3dAnimations = window._p3dAnimations || {{}};
+                const s = all['{self.id}'] = all['{self.id}'] || {{buffer: [], next: 0, seq: 0, pending: 0, latency: 0, batch: {self.batch}}};
+                const now = Date.now();
+                if (n && s.buffer.length) {{
+                    const frame = s.buffer.shift();
+                    const outer = document.getElementById('{self.graph_id}');
+                    const div = outer && (outer.classList.contains('js-plotly-plot') ? outer : outer.querySelector('.js-plotly-plot'));
+                    if (div) {{
+                        Plotly.restyle(div, frame.update, frame.traces);
+                    }}
+                    dash_clientside.set_props('{self.value_id}', {{data: frame.value}});
+                }}
+                // Ask for more frames while there are still enough to play until they arrive
+                const need = Math.ceil(s.latency * {self.fps} / 1000) + 1;
+                if (s.buffer.length <= need && (!s.pending || now - s.pending > 10000)) {{
+                    s.pending = now;
+                    s.seq += 1;
+                    dash_clientside.set_props('{self.request_id}', {{data: {{start: s.next, count: s.batch, seq: s.seq}}}});
+                }}
+            }}
+            """,
+            Input(self.id, 'n_intervals')
+        )
+        app.clientside_callback(
+            f"""
+            function(data) {{
+                const s = (window._p3dAnimations || {{}})['{self.id}'];
+                if (!s || !data || data.start !== s.next) {{
+                    return;
+                }}
+                const latency = Date.now() - s.pending;
+                s.latency = s.latency ? 0.7 * s.latency + 0.3 * latency : latency;
+                s.pending = 0;
+                s.next += data.values.length;
+                const need = Math.ceil(s.latency * {self.fps} / 1000) + 1;
+                s.batch = Math.max({self.batch}, Math.min({self.max_batch}, 2 * need));
+                const types = {{f8: Float64Array, f4: Float32Array, i1: Int8Array, u1: Uint8Array, i2: Int16Array, u2: Uint16Array, i4: Int32Array, u4: Uint32Array}};
+                const stacks = data.data.map(function(props) {{
+                    const decoded = {{}};
+                    for (const name in props) {{
+                        const raw = atob(props[name].bdata);
+                        const bytes = new Uint8Array(raw.length);
+                        for (let i = 0; i < raw.length; i++) {{
+                            bytes[i] = raw.charCodeAt(i);
+                        }}
+                        decoded[name] = [new types[props[name].dtype](bytes.buffer), props[name].shape];
+                    }}
+                    return decoded;
+                }});
+                data.values.forEach(function(value, i) {{
+                    const update = {{}};
+                    stacks.forEach(function(props, t) {{
+                        for (const name in props) {{
+                            const [array, shape] = props[name];
+                            const size = shape.slice(1).reduce((a, b) => a * b, 1);
+                            let frame = array.subarray(i * size, (i + 1) * size);
+                            if (shape.length === 1) {{
+                                frame = frame[0];
+                            }} else if (shape.length === 3) {{
+                                const rows = frame;
+                                frame = Array.from({{length: shape[1]}}, (_, r) => rows.subarray(r * shape[2], (r + 1) * shape[2]));
+                            }}
+                            (update[name] = update[name] || new Array(stacks.length))[t] = frame; // Traces without this property keep theirs
+                        }}
+                    }});
+                    s.buffer.push({{value: value, update: update, traces: data.traces}});
+                }});
+            }}
+            """,
+            Input(self.frames_id, 'data'),
+            prevent_initial_call = True
+        )
         @app.callback(
-            *[Output(output[0], output[1]) for output in outputs],
-            Input(self.value_id, 'data'),
-            *[Input(input[0], input[1]) for input in other_inputs],
-            *[State(state[0], state[1]) for state in states],
-            prevent_initial_call = not starting_call
+            Output(self.frames_id, 'data'),
+            Input(self.request_id, 'data'),
+            prevent_initial_call = True
+        )
+        def frames(request):
+            count = max(1, min(int(request['count']), self.max_batch))
+            values = self.start + self.step * np.arange(request['start'], request['start'] + count)
+            props = self.func(values)
+            if isinstance(props, dict):
+                props = [props]
+            return dict(
+                start = request['start'],
+                values = values.tolist(),
+                traces = self.traces if self.traces is not None else list(range(len(props))),
+                data = [{name: Animation._encode(array, count) for name, array in trace.items()} for trace in props]
+            )
+
+    @staticmethod
+    def _encode(array: np.ndarray, count: int) -> Dict[str, any]:
+        # All frames of one property as one base64 string, decoded by the webpage into a typed array
+        array = np.asarray(array)
+        if array.ndim == 0:
+            array = np.broadcast_to(array, (count,))
+        if array.dtype == bool:
+            array = array.astype(np.uint8)
+        elif array.dtype.str[1:] not in Animation._types:
+            array = array.astype(np.float64)
+        array = np.ascontiguousarray(array, dtype = array.dtype.newbyteorder('<'))
+        return dict(dtype = array.dtype.str[1:], bdata = base64.b64encode(array.data).decode('ascii'), shape = list(array.shape))
+
+class Stream(dcc.Store):
+    """
+    A channel for the server to push updates to every open webpage, extends :dcc:`dash.dcc.Store<store>`.
+    Updates are sent with Server-Sent Events only when they are published, instead of being polled for like with :class:`Interval`.
+    Updates only reach webpages connected to the process that published them, and each open webpage holds one of the server's threads,
+    so :meth:`Webpage.serve` uses one worker process for webpages with a Stream
+    """
+    def __init__(self, app: Dash, id: str = None, data: any = None, heartbeat: float = 15, buffer: int = 64, **kwargs):
+        """
+        Creates a Stream
+
+        Parameters
+        ----------
+        app
+            the :dash:`dash.Dash<dash>` app that has this stream and serves its updates
+        id
+            the unique id to identify this stream with
+        data
+            initial data stored in this stream
+        heartbeat
+            the number of seconds between keep-alive messages when nothing is published
+        buffer
+            the number of updates kept for each webpage that has not received them yet; older updates are dropped first
+        """
+        if not id:
+            id = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+        self.heartbeat: float = heartbeat
+        self.buffer: int = buffer
+        self._subscribers: List[queue.Queue] = []
+        self._latest: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        super().__init__(id = id, data = data, **kwargs)
+        route = f'_p3d-stream/{id}'
+        app.server.add_url_rule(f'{app.config.routes_pathname_prefix}{route}', endpoint = f'p3d-stream-{id}', view_func = self._serve)
+        app.clientside_callback(
+            f"""
+            function(id) {{
+                window._p3dStreams = window._p3dStreams || {{}};
+                if (!window._p3dStreams[id]) {{
+                    const source = new EventSource('{app.config.requests_pathname_prefix}{route}');
+                    source.onmessage = function(event) {{
+                        const message = JSON.parse(event.data);
+                        dash_clientside.set_props(message[0], message[1]);
+                    }};
+                    window._p3dStreams[id] = source;
+                }}
+            }}
+            """,
+            Input(self.id, 'id')
+        )
+
+    @property
+    def subscribers(self) -> int:
+        """The number of webpages currently receiving updates from this stream"""
+        return len(self._subscribers)
+
+    def publish(self, data: any) -> None:
+        """
+        Sets the data in this stream on every open webpage.
+        Callbacks with this stream's data as an input run as usual
+
+        Parameters
+        ----------
+        data
+            the new data. Figures and NumPy arrays are allowed
+        """
+        self.push(self.id, 'data', data)
+
+    def push(self, component_id: str, property: str, value: any) -> None:
+        """
+        Sets a property of any component on every open webpage, without a callback
+
+        Parameters
+        ----------
+        component_id
+            the id of the component to update, such as a :class:`Graph`
+        property
+            the property of the component to update, such as ``'figure'``
+        value
+            the new value of the property. Figures and NumPy arrays are allowed
+        """
+        message = to_json_plotly([component_id, {property: value}])
+        with self._lock:
+            self._latest[(component_id, property)] = message
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                try:
+                    subscriber.get_nowait() # Drop the oldest update
+                except queue.Empty:
+                    pass
+                subscriber.put_nowait(message)
+
+    def _serve(self) -> flask.Response:
+        subscriber = queue.Queue(maxsize = self.buffer)
+        with self._lock:
+            latest = list(self._latest.values()) # Webpages that connect late start from the latest updates
+            self._subscribers.append(subscriber)
+        def events():
+            try:
+                for message in latest:
+                    yield f'data: {message}\n\n'
+                while True:
+                    try:
+                        yield f'data: {subscriber.get(timeout = self.heartbeat)}\n\n'
+                    except queue.Empty:
+                        yield ': heartbeat\n\n'
+            finally:
+                with self._lock:
+                    self._subscribers.remove(subscriber)
+        return flask.Response(
+            events(),
+            mimetype = 'text/event-stream',
+            headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
         )
-        def callback(*args):
-            return func(*args)
 
 class Upload(dcc.Upload):
     """Allows for uploading files, extends :dcc:`dash.dcc.Upload<upload>`"""
@@ -412,7 +1142,10 @@ class Upload(dcc.Upload):
             children = text
         super().__init__(style = style, multiple = multiple, children = children, **kwargs)
 
-    def on_upload(self, app: Dash, func: Callable, outputs: List[List[str]] = [], other_states: List[List[str]] = [], starting_call: bool = False):
+    _chunk_size = 4 * 2**20 # Number of base64 characters decoded at a time; must be a multiple of 4
+    _leftover_files = set() # Temporary files that could not be removed while still mapped
+
+    def on_upload(self, app: Dash, func: Callable, outputs: List[List[str]] = [], other_states: List[List[str]] = [], starting_call: bool = False, parse: bool = False, max_workers: int = None):
         """
         What to do when files are uploaded
         
@@ -433,6 +1166,10 @@ class Upload(dcc.Upload):
             List of any states to use or additional inputs. Both states and inputs are used as arguments, but this event will be called whenever any input is modified, but not when any state is modified. Same style as `outputs`
         starting_call
             whether to call this event on load of the webpage
+        parse
+            whether to give `func` the parsed content of each file (see :meth:`Upload.parse`) instead of the raw base64 string
+        max_workers
+            the number of threads used to parse files in parallel when multiple is True; defaults to one per file, up to the number of CPUs
         """
         @app.callback(
             *[Output(output[0], output[1]) for output in outputs],
@@ -442,5 +1179,69 @@ class Upload(dcc.Upload):
             *[State(state[0], state[1]) for state in other_states],
             prevent_initial_call = not starting_call
         )
-        def callback(*args):
-            return func(*args)
\ No newline at end of file
+        def callback(contents, filenames, *args):
+            if parse and contents is not None:
+                if isinstance(contents, list):
+                    workers = max_workers or min(len(contents), os.cpu_count() or 1)
+                    with ThreadPoolExecutor(max_workers = max(workers, 1)) as pool:
+                        contents = list(pool.map(Upload.parse, contents, filenames))
+                else:
+                    contents = Upload.parse(contents, filenames)
+            return func(contents, filenames, *args)
+
+    @staticmethod
+    def parse(contents: str, filename: str) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Parses the content of an uploaded file into NumPy arrays.
+        The base64 data is decoded in chunks into a temporary file, so the whole file is never held as bytes in memory.
+
+        Parameters
+        ----------
+        contents
+            the base64 data URL given by the upload, as in ``'data:text/csv;base64,...'``
+        filename
+            the name of the uploaded file; its extension decides how it is parsed:\n
+            \t ``.npy``: a read-only memory-mapped array\n
+            \t ``.npz``: a dictionary of arrays\n
+            \t ``.csv``: a 2D float array, skipping a header row if there is one\n
+            \t anything else: a read-only memory-mapped array of the raw bytes
+
+        :return data: the parsed content of the file
+        """
+        start = contents.index(',') + 1
+        fd, path = tempfile.mkstemp(suffix = os.path.splitext(filename)[1])
+        with os.fdopen(fd, 'wb') as file:
+            for i in range(start, len(contents), Upload._chunk_size):
+                file.write(base64.b64decode(contents[i:i + Upload._chunk_size]))
+        extension = os.path.splitext(filename)[1].lower()
+        try:
+            if extension == '.npz':
+                with np.load(path) as npz:
+                    return {name: npz[name] for name in npz.files}
+            if extension == '.csv':
+                with open(path, 'r') as file:
+                    header = file.readline().split(',')
+                try:
+                    [float(value) for value in header]
+                    skip = 0
+                except ValueError:
+                    skip = 1
+                return np.loadtxt(path, delimiter = ',', skiprows = skip, ndmin = 2)
+            if extension == '.npy':
+                return np.load(path, mmap_mode = 'r')
+            if os.path.getsize(path) == 0:
+                return np.zeros(0, dtype = np.uint8)
+            return np.memmap(path, dtype = np.uint8, mode = 'r')
+        finally:
+            try:
+                os.remove(path) # Memory maps stay valid after removal on POSIX systems
+            except OSError:
+                Upload._leftover_files.add(path)
+
+@atexit.register
+def _remove_leftover_uploads():
+    for path in Upload._leftover_files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass